@@ -0,0 +1,239 @@
+"""
+Benchmark suite for the audio hot path. Runs without a microphone, on deterministic synthetic signals.
+
+Run with: python -m benchmarks [--quick] [--out results.json] [--only name ...]
+
+Every case reports the throughput in audio frames per second and the p50 / p99 latency per chunk. The json output can
+be compared across commits.
+"""
+import json
+import os
+import platform
+import subprocess
+import tempfile
+from argparse import ArgumentParser
+from time import perf_counter_ns
+from typing import Callable, Dict, List
+
+import numpy as np
+
+from .signals import CHANNELS, SAMPLE_RATES, SIGNALS, chunks, generate
+
+CHUNK = 480
+METRICS = ("name", "calls", "frames_per_s", "p50_us", "p99_us")
+
+
+def measure(name: str, func: Callable, items: List, frames_per_item: int, **info) -> Dict:
+    """
+    Call `func` on every item and collect the latency of each call. The first item is used as an untimed warm up so
+    one time setup (e.g. building filter matrices) does not end up in the percentiles.
+    """
+    func(items[0])
+    times = []
+    for item in items[1:]:
+        start = perf_counter_ns()
+        func(item)
+        times.append(perf_counter_ns() - start)
+
+    ns = np.array(times, dtype=np.float64)
+    total_s = ns.sum() / 1e9
+    return {
+        "name": name,
+        **info,
+        "calls": len(times),
+        "frames_per_s": round(len(times) * frames_per_item / total_s) if total_s > 0 else 0,
+        "p50_us": round(float(np.percentile(ns, 50)) / 1000, 2),
+        "p99_us": round(float(np.percentile(ns, 99)) / 1000, 2),
+    }
+
+
+def bench_get_db(seconds: float) -> List[Dict]:
+    from hush.utils.audio.device import get_db
+
+    results = []
+    for kind in SIGNALS:
+        for rate in SAMPLE_RATES:
+            for ch in CHANNELS:
+                data = list(chunks(generate(kind, rate, ch, seconds), CHUNK))
+                results.append(measure("get_db", get_db, data, CHUNK, signal=kind, sample_rate=rate, channels=ch))
+    return results
+
+
+def bench_vad(seconds: float) -> List[Dict]:
+    from webrtcvad import Vad
+
+    results = []
+    for mode in (0, 1, 2, 3):
+        vad = Vad(mode)
+        for kind in SIGNALS:
+            for rate in SAMPLE_RATES:
+                frame = rate * 30 // 1000  # 30 ms, mono
+                data = list(chunks(generate(kind, rate, 1, seconds), frame))
+                results.append(
+                    measure(
+                        "vad.is_speech",
+                        lambda d: vad.is_speech(d, rate),
+                        data,
+                        frame,
+                        mode=mode,
+                        signal=kind,
+                        sample_rate=rate,
+                        channels=1
+                    )
+                )
+    return results
+
+
+def bench_engine(seconds: float) -> List[Dict]:
+    """
+    Full decision path of a chunk: db, VAD, aggregation and the alert scheduler
+    """
+    from hush.analyze import SettingCache
+    from hush.engine import HushEngine
+    from hush.utils.setting import default_setting
+
+    results = []
+    for vad_mode, weighting in (("Off", "Off"), ("2", "Off"), ("2", "A"), ("2", "K")):
+        for kind in SIGNALS:
+            for rate in SAMPLE_RATES:
+                for ch in CHANNELS:
+                    setting = dict(default_setting, vad_mode=vad_mode, weighting=weighting)
+                    engine = HushEngine(SettingCache(setting))
+                    engine.add_monitor(rate, ch, "bench")
+                    data = list(chunks(generate(kind, rate, ch, seconds), CHUNK))
+                    results.append(
+                        measure(
+                            "engine.process",
+                            engine.process,
+                            data,
+                            CHUNK,
+                            vad_mode=vad_mode,
+                            weighting=weighting,
+                            signal=kind,
+                            sample_rate=rate,
+                            channels=ch
+                        )
+                    )
+    return results
+
+
+def bench_ballistics(seconds: float) -> List[Dict]:
+    from hush.utils.audio.ballistics import MeterBallistics
+
+    results = []
+    for kind in SIGNALS:
+        for rate in SAMPLE_RATES:
+            for ch in CHANNELS:
+                ballistics = MeterBallistics(rate, ch)
+                data = list(chunks(generate(kind, rate, ch, seconds), CHUNK))
+                results.append(
+                    measure(
+                        "MeterBallistics.process",
+                        ballistics.process,
+                        data,
+                        CHUNK,
+                        signal=kind,
+                        sample_rate=rate,
+                        channels=ch
+                    )
+                )
+    return results
+
+
+def bench_meter(seconds: float) -> List[Dict]:
+    from tkinter import TclError, Tk
+
+    from hush.components.audio import AudioMeter
+
+    try:
+        root = Tk()
+    except TclError as e:
+        print(f"Skipping meter benchmark, no display: {e}")
+        return []
+
+    meter = AudioMeter(
+        root, root, show_threshold=True, threshold=-8, min=-81, max=1, performance_mode=False, width=400, height=40
+    )
+    meter.pack()
+    root.update()
+
+    rng = np.random.default_rng(0)
+    dbs = list(rng.uniform(-80, 0, int(seconds * 100)))  # the meter refreshes at 100 Hz
+
+    def meter_update(db):
+        meter.set_db(db)
+        meter.meter_update()
+        root.update_idletasks()
+
+    def bar_update(db):
+        meter.bar_update(int((db + 81) / 82 * 400))
+        root.update_idletasks()
+
+    results = [
+        measure("AudioMeter.meter_update", meter_update, dbs, 0),
+        measure("AudioMeter.bar_update", bar_update, dbs, 0),
+    ]
+    root.destroy()
+    return results
+
+
+def bench_save_key(seconds: float) -> List[Dict]:
+    from hush.utils.setting import SettingJson
+
+    with tempfile.TemporaryDirectory() as tmp:
+        sj = SettingJson(os.path.join(tmp, "setting.json"), tmp, [])
+        values = [i % 2 == 0 for i in range(int(seconds * 100))]  # alternate so every call actually writes
+        return [measure("SettingJson.save_key", lambda v: sj.save_key("keep_log", v), values, 0)]
+
+
+BENCHMARKS = {
+    "get_db": bench_get_db,
+    "vad": bench_vad,
+    "engine": bench_engine,
+    "ballistics": bench_ballistics,
+    "meter": bench_meter,
+    "save_key": bench_save_key,
+}
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True).stdout.strip()
+    except Exception:
+        return ""
+
+
+def main():
+    parser = ArgumentParser(prog="benchmarks", description="Benchmark the Hush audio hot path")
+    parser.add_argument("--quick", action="store_true", help="Use 1 second signals instead of 10")
+    parser.add_argument("--only", nargs="+", choices=list(BENCHMARKS), help="Only run these benchmarks")
+    parser.add_argument("--out", help="Write the results to this json file")
+    args = parser.parse_args()
+
+    seconds = 1.0 if args.quick else 10.0
+    results = []
+    for name in args.only or BENCHMARKS:
+        for r in BENCHMARKS[name](seconds):
+            results.append(r)
+            info = " ".join(f"{k}={v}" for k, v in r.items() if k not in METRICS)
+            fps = f"{r['frames_per_s']:>12} frames/s" if r["frames_per_s"] else " " * 21
+            print(f"{r['name']:<24} {info:<55} {fps} p50 {r['p50_us']:>9.2f} us  p99 {r['p99_us']:>9.2f} us")
+
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(
+                {
+                    "commit": git_commit(),
+                    "python": platform.python_version(),
+                    "machine": platform.machine(),
+                    "chunk_size": CHUNK,
+                    "seconds": seconds,
+                    "results": results,
+                },
+                f,
+                indent=4,
+            )
+
+
+if __name__ == "__main__":
+    main()
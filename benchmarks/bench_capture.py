@@ -0,0 +1,90 @@
+"""
+CPU time per second of audio of the two capture modes: the PortAudio callback (one python wakeup per chunk) against
+pull capture (blocking reads of several chunks, analyzed as one block).
+
+- analysis: the engine side only, on synthetic noise, no device needed. Chunk by chunk `process` against `process_block`
+  on blocks of the size pull capture reads, for every latency profile
+- device (with --device): the saved device opened in each mode for a few seconds, whole process CPU time, so the
+  PortAudio callback overhead is included. Needs a microphone
+
+Run with: python -m benchmarks.bench_capture [--device] [--seconds 10]
+"""
+from argparse import ArgumentParser
+from time import perf_counter, process_time, sleep
+
+from hush.analyze import SettingCache
+from hush.engine import HushEngine
+from hush.utils.audio.latency import LATENCY_PROFILES
+from hush.utils.audio.source import SyntheticSource
+from hush.utils.setting import default_setting
+
+SAMPLE_RATE = 16000
+
+
+def bench_analysis(seconds: float):
+    print(f"analysis of {seconds:.0f} s of noise at {SAMPLE_RATE} Hz, CPU ms per audio second")
+    for profile in LATENCY_PROFILES.values():
+        chunk_size = profile.chunk_size(SAMPLE_RATE)
+        batch = profile.pull_batch()
+        source = SyntheticSource("noise", -20, SAMPLE_RATE, chunk_size=chunk_size, seconds=seconds, realtime=False)
+        chunks = list(source.chunks())
+        usable = len(chunks) - len(chunks) % batch
+        blocks = [b"".join(chunks[i:i + batch]) for i in range(0, usable, batch)]
+
+        results = {}
+        for mode, items in (("callback", chunks[:usable]), ("pull", blocks)):
+            engine = HushEngine(SettingCache(dict(default_setting, latency_profile=profile.name)), ballistics=True)
+            monitor = engine.add_monitor(SAMPLE_RATE, 1, mode)
+            monitor.source = source
+            process = engine.process if mode == "callback" else engine.process_block
+            start = process_time()
+            for item in items:
+                process(item, monitor)
+            results[mode] = ((process_time() - start) * 1000 / monitor.audio_time, len(items) / monitor.audio_time)
+
+        print(
+            f"  {profile.name:<12} callback {results['callback'][0]:6.2f} ms ({results['callback'][1]:5.1f} wakeups/s)"
+            f" | pull x{batch:<2} {results['pull'][0]:6.2f} ms ({results['pull'][1]:5.1f} wakeups/s)"
+        )
+
+
+def bench_device(seconds: float):
+    from hush.globals import sj
+    from hush.utils.audio.session import session
+
+    if not sj.cache["device"]:
+        print("device: no device saved, select one in the app first")
+        return
+
+    print(f"device {sj.cache['device']}, {seconds:.0f} s per mode, process CPU ms per audio second")
+    for profile in LATENCY_PROFILES:
+        for mode in ("callback", "pull"):
+            setting = SettingCache(dict(sj.cache, latency_profile=profile, capture_mode=mode, auto_reconnect=False))
+            engine = HushEngine(setting, ballistics=True)
+            engine.open()
+            sleep(0.5)  # skip the stream start up
+            cpu, wall = process_time(), perf_counter()
+            wakeups = engine.monitors[0].callback_stats.count
+            audio = engine.monitors[0].audio_time
+            sleep(seconds)
+            cpu, wall = process_time() - cpu, perf_counter() - wall
+            wakeups = engine.monitors[0].callback_stats.count - wakeups
+            audio = engine.monitors[0].audio_time - audio
+            engine.close()
+            print(f"  {profile:<12} {mode:<8} {cpu * 1000 / audio:6.2f} ms ({wakeups / wall:5.1f} wakeups/s)")
+    session.terminate()
+
+
+def main():
+    parser = ArgumentParser()
+    parser.add_argument("--device", action="store_true", help="Also measure on the saved device")
+    parser.add_argument("--seconds", type=float, default=10.0)
+    args = parser.parse_args()
+
+    bench_analysis(args.seconds)
+    if args.device:
+        bench_device(args.seconds)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""
+Stress test of the ui channel: several producer threads post thousands of updates per second while the consumer
+drains at the meter refresh rate, the same way the Tk `after` loop does. No display needed.
+
+Checks that the consumer always ends up with the latest value of every key, that it is called at most once per drain
+and only with changed keys, and reports the cost of a post on the producer side.
+
+Run with: python -m benchmarks.bench_channel [seconds]
+"""
+import sys
+from threading import Event, Thread
+from time import perf_counter, perf_counter_ns, sleep
+
+import numpy as np
+
+from hush.utils.channel import UiChannel
+
+PRODUCERS = 4
+POSTS_PER_SECOND = 5000  # per producer, a 480 frame chunk at 48 kHz is only 100 per second
+FPS = 30
+
+
+def main():
+    seconds = float(sys.argv[1]) if len(sys.argv) > 1 else 5.0
+    applied = []
+    channel = UiChannel(None, applied.append, FPS)
+    stop = Event()
+    last_posted = {}
+    post_ns = [[] for _ in range(PRODUCERS)]
+
+    def produce(i: int):
+        interval = 1 / POSTS_PER_SECOND
+        next_time = perf_counter()
+        n = 0
+        while not stop.is_set():
+            n += 1
+            start = perf_counter_ns()
+            channel.post(**{f"db{i}": n, "alerting": n % 100 < 50})
+            post_ns[i].append(perf_counter_ns() - start)
+            last_posted[f"db{i}"] = n
+            next_time += interval
+            delay = next_time - perf_counter()
+            if delay > 0:
+                sleep(delay)
+
+    threads = [Thread(target=produce, args=[i], daemon=True) for i in range(PRODUCERS)]
+    for t in threads:
+        t.start()
+
+    drains = 0
+    drain_ns = []
+    end = perf_counter() + seconds
+    while perf_counter() < end:
+        sleep(1 / FPS)
+        start = perf_counter_ns()
+        channel.drain()
+        drain_ns.append(perf_counter_ns() - start)
+        drains += 1
+
+    stop.set()
+    for t in threads:
+        t.join()
+    channel.drain()  # quiescent, must catch up with the very last posts
+
+    posts = np.concatenate([np.array(p, dtype=np.float64) for p in post_ns])
+    print(f"{PRODUCERS} producers, {channel.posts} posts in {seconds:.0f} s ({channel.posts / seconds:.0f} per second)")
+    print(f"post:  p50 {np.percentile(posts, 50) / 1000:.2f} us  p99 {np.percentile(posts, 99) / 1000:.2f} us")
+    print(f"drain: p50 {np.percentile(drain_ns, 50) / 1000:.2f} us  p99 {np.percentile(drain_ns, 99) / 1000:.2f} us")
+    print(f"{drains + 1} drains, {len(applied)} ui updates")
+
+    assert len(applied) <= drains + 1, "more ui updates than drains"
+    assert all(changed for changed in applied), "ui update without any change"
+    for key, value in last_posted.items():
+        assert channel.applied[key] == value, f"{key}: latest value {value} was not applied"
+    print("OK, the latest value of every key was applied")
+
+
+if __name__ == "__main__":
+    main()
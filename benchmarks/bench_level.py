@@ -0,0 +1,91 @@
+"""
+Compare the NumPy level module against the previous audioop based get_db, per 480 frame chunk:
+
+- single chunk: get_db must be at least as fast as the audioop get_db
+- batched: get_db_batch must be faster per chunk than calling the audioop get_db on every chunk
+
+Run with: python -m benchmarks.bench_level
+"""
+import math
+import timeit
+import warnings
+
+import numpy as np
+
+from hush.utils.audio.device import get_db, get_db_batch
+from hush.utils.audio.level import get_levels, get_levels_batch, get_rms_db
+
+with warnings.catch_warnings():
+    warnings.simplefilter("ignore", DeprecationWarning)
+    try:
+        from audioop import rms as calculate_rms  # removed in python 3.13
+    except ImportError:
+        calculate_rms = None
+
+CHUNK = 480
+BATCH = 1000
+CHUNK_PERIOD_US = 30000  # 480 frames at 16 kHz
+
+
+def legacy_get_db(audio_data: bytes) -> float:
+    """
+    get_db as it was before the level module, kept here for comparison
+    """
+    assert calculate_rms is not None
+    rms: float = calculate_rms(audio_data, 2) / 32767
+    if rms == 0.0:
+        return 0.0
+    else:
+        return 20 * np.log10(rms)
+
+
+def per_call_us(func, number: int) -> float:
+    return min(timeit.repeat(func, number=number, repeat=5)) / number * 1e6
+
+
+def main():
+    rng = np.random.default_rng(0)
+    mono = (rng.standard_normal(CHUNK) * 3000).astype(np.int16).tobytes()
+    stereo = (rng.standard_normal(CHUNK * 2) * 3000).astype(np.int16).tobytes()
+    batch = [(rng.standard_normal(CHUNK) * 3000).astype(np.int16).tobytes() for _ in range(BATCH)]
+
+    block = b"".join(batch)
+
+    results = {}  # us per chunk
+    if calculate_rms is not None:
+        results["legacy get_db (audioop), 1 chunk"] = per_call_us(lambda: legacy_get_db(mono), 20000)
+        results["legacy get_db (audioop), batched"] = per_call_us(lambda: [legacy_get_db(c) for c in batch], 20) / BATCH
+    results["get_db, 1 chunk"] = per_call_us(lambda: get_db(mono), 20000)
+    results["get_rms_db, 1 chunk"] = per_call_us(lambda: get_rms_db(mono), 20000)
+    results["get_levels mono, 1 chunk"] = per_call_us(lambda: get_levels(mono), 20000)
+    results["get_levels stereo, 1 chunk"] = per_call_us(lambda: get_levels(stereo, channels=2), 20000)
+    results["get_db_batch, batched"] = per_call_us(lambda: get_db_batch(block, CHUNK), 20) / BATCH
+    results["get_levels_batch, batched"] = per_call_us(lambda: get_levels_batch(batch), 20) / BATCH
+
+    print(f"Chunk size: {CHUNK} frames (int16), batches of {BATCH} chunks, us per chunk")
+    for name, us in results.items():
+        print(f"{name:<45} {us:>12.2f} us")
+
+    single = results["get_db, 1 chunk"]
+    print(f"get_db uses {single / CHUNK_PERIOD_US * 100:.3f}% of the 30 ms chunk period")
+    if calculate_rms is None:
+        print("audioop is not available on this python, nothing to compare against")
+        return
+
+    legacy_single = results["legacy get_db (audioop), 1 chunk"]
+    legacy = results["legacy get_db (audioop), batched"]
+    batched = results["get_db_batch, batched"]
+    print(
+        f"single chunk: get_db {single:.2f} us against {legacy_single:.2f} us with audioop "
+        f"({single / legacy_single:.1f}x): {'ok' if single <= legacy_single else 'FAILED'}"
+        f"\nbatched: get_db_batch {batched:.2f} us against {legacy:.2f} us with audioop per chunk: "
+        f"{'ok' if batched <= legacy else 'FAILED'}"
+    )
+
+    # sanity check, both should agree to within the 32767 vs 32768 full scale difference
+    assert math.isclose(legacy_get_db(mono), get_rms_db(mono), abs_tol=0.01)
+    assert np.allclose(get_db_batch(block, CHUNK), [get_db(c) for c in batch], atol=1e-3)
+
+
+if __name__ == "__main__":
+    main()
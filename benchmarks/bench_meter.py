@@ -0,0 +1,84 @@
+"""
+CPU cost of the AudioMeter at the 100 Hz refresh rate, retained mode (move the bar) against the previous immediate mode
+(delete everything and redraw the bar and the ruler every tick). Needs a display.
+
+Run with: python -m benchmarks.bench_meter [seconds]
+"""
+import sys
+from time import perf_counter, process_time
+from tkinter import TclError, Tk
+
+import numpy as np
+
+from hush.components.audio import AudioMeter
+
+WIDTH, HEIGHT = 400, 40
+MIN_DB, MAX_DB = -81, 1
+REFRESH_MS = 10  # update_visual rate
+
+
+class LegacyAudioMeter(AudioMeter):
+    """
+    bar_update and ruler_update as they were before the retained mode meter, kept here for comparison
+    """
+    def bar_update(self, bar_width):
+        self.delete("all")
+        self.create_rectangle(0, 0, bar_width, self.winfo_height(), fill="green", tags="loudness_bar")
+        self.ruler_key = None
+        self.ruler_update()
+
+
+def cpu_percent(root: Tk, meter: AudioMeter, seconds: float) -> float:
+    """
+    Drive the meter with random levels at the refresh rate for `seconds`, return the process CPU usage in percent
+    """
+    rng = np.random.default_rng(0)
+    dbs = iter(rng.uniform(MIN_DB + 1, MAX_DB - 1, int(seconds * 1000 / REFRESH_MS) + 1))
+
+    def tick():
+        db = next(dbs, None)
+        if db is None:
+            root.quit()
+            return
+        meter.set_db(db)
+        meter.meter_update()
+        root.after(REFRESH_MS, tick)
+
+    cpu, wall = process_time(), perf_counter()
+    root.after(REFRESH_MS, tick)
+    root.mainloop()
+    return (process_time() - cpu) / (perf_counter() - wall) * 100
+
+
+def main():
+    seconds = float(sys.argv[1]) if len(sys.argv) > 1 else 10.0
+    try:
+        root = Tk()
+    except TclError as e:
+        print(f"No display: {e}")
+        return
+
+    print(f"AudioMeter {WIDTH}x{HEIGHT} at {1000 // REFRESH_MS} Hz for {seconds:.0f} s")
+    for name, cls in (("immediate mode (before)", LegacyAudioMeter), ("retained mode (after)", AudioMeter)):
+        meter = cls(
+            root,
+            root,
+            show_threshold=True,
+            threshold=-8,
+            min=MIN_DB,
+            max=MAX_DB,
+            performance_mode=False,
+            width=WIDTH,
+            height=HEIGHT
+        )
+        meter.pack()
+        root.update()
+        usage = cpu_percent(root, meter, seconds)
+        print(f"{name:<25} {usage:>6.1f} % cpu, {len(meter.find_all()):>4} canvas items")
+        meter.destroy()
+
+    root.destroy()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""
+Startup time and peak memory of the app, window first (default) against tray first (--tray). Needs a display and a
+device already selected in the setting, since tray first monitors that device right away.
+
+Every run starts a fresh process, waits until it logs the stage that marks it as ready, then stops it.
+Window first is ready when the main window is built, tray first when monitoring started.
+
+Run with: python -m benchmarks.bench_startup [runs]
+"""
+import re
+import subprocess
+import sys
+from time import perf_counter
+from typing import Dict, List
+
+STARTUP_RE = re.compile(r"Startup: (?P<stage>.+?) after (?P<ms>[\d.]+) ms, peak RSS (?P<rss>[\d.]+) MB")
+MODES = {"window first": ([], "main window built"), "tray first": (["--tray"], "monitoring started")}
+TIMEOUT = 30
+
+
+def run_once(args: List[str], ready: str) -> Dict[str, Dict[str, float]]:
+    """
+    Start the app and collect every startup stage it logs until `ready`
+    """
+    stages = {}
+    start = perf_counter()
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "hush", *args], stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True
+    )
+    try:
+        assert proc.stdout is not None
+        for line in proc.stdout:
+            m = STARTUP_RE.search(line)
+            if m:
+                stages[m["stage"]] = {"ms": float(m["ms"]), "rss_mb": float(m["rss"])}
+                if m["stage"] == ready:
+                    stages["process wall"] = {"ms": (perf_counter() - start) * 1000, "rss_mb": float(m["rss"])}
+                    break
+            if perf_counter() - start > TIMEOUT:
+                break
+    finally:
+        proc.kill()
+        proc.wait()
+
+    return stages
+
+
+def main():
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    for mode, (args, ready) in MODES.items():
+        results: Dict[str, List[Dict[str, float]]] = {}
+        for _ in range(runs):
+            for stage, value in run_once(args, ready).items():
+                results.setdefault(stage, []).append(value)
+
+        if ready not in results:
+            print(f"{mode}: never reached '{ready}', check the log (is a device selected?)")
+            continue
+
+        print(f"{mode} ({runs} runs, median)")
+        for stage, values in results.items():
+            ms = sorted(v["ms"] for v in values)[len(values) // 2]
+            rss = sorted(v["rss_mb"] for v in values)[len(values) // 2]
+            print(f"  {stage:<22} {ms:>8.0f} ms  peak RSS {rss:>6.1f} MB")
+
+
+if __name__ == "__main__":
+    main()
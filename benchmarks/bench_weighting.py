@@ -0,0 +1,57 @@
+"""
+Cost of the streaming A and K weighting filters per chunk, compared to the unweighted level. The long chunk case is the
+low-power latency profile (100 ms buffers) at 48 kHz, with the time of the first call that builds the filter matrices.
+
+Run with: python -m benchmarks.bench_weighting
+"""
+import timeit
+from time import perf_counter
+
+import numpy as np
+
+from hush.utils.audio.level import get_rms_db
+from hush.utils.audio.weighting import SUPPORTED_RATES, WeightingFilter
+
+CHUNK = 480
+LONG_CHUNK = (48000, 4800)  # sample rate, frames of a 100 ms chunk
+
+
+def per_call_us(func, number: int) -> float:
+    return min(timeit.repeat(func, number=number, repeat=5)) / number * 1e6
+
+
+def main():
+    rng = np.random.default_rng(0)
+    print(f"Chunk size: {CHUNK} frames (int16), real time budget is the chunk duration")
+    for rate in SUPPORTED_RATES:
+        budget_us = CHUNK / rate * 1e6
+        for channels in (1, 2):
+            chunk = (rng.standard_normal(CHUNK * channels) * 3000).astype(np.int16).tobytes()
+            results = {"unweighted": per_call_us(lambda: get_rms_db(chunk), 5000)}
+            for weighting in ("A", "K"):
+                f = WeightingFilter(weighting, rate, channels)
+                f.get_db(chunk)  # build the block matrices outside of the timing
+                results[weighting] = per_call_us(lambda: f.get_db(chunk), 2000)
+
+            line = " | ".join(f"{k} {v:8.1f} us ({v / budget_us * 100:5.2f}%)" for k, v in results.items())
+            print(f"{rate:>5} Hz {channels}ch | {line}")
+
+    rate, frames = LONG_CHUNK
+    budget_us = frames / rate * 1e6
+    print(f"Long chunk: {frames} frames at {rate} Hz")
+    for channels in (1, 2):
+        chunk = (rng.standard_normal(frames * channels) * 3000).astype(np.int16).tobytes()
+        for weighting in ("A", "K"):
+            f = WeightingFilter(weighting, rate, channels)
+            start = perf_counter()
+            f.get_db(chunk)
+            build_ms = (perf_counter() - start) * 1000
+            us = per_call_us(lambda: f.get_db(chunk), 200)
+            print(
+                f"{rate:>5} Hz {channels}ch | {weighting} {us:8.1f} us ({us / budget_us * 100:5.2f}%)"
+                f" | first call {build_ms:6.1f} ms"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+"""
+Deterministic check of the alert scheduler timing: attack delay, release hysteresis, cooldown and max beeps per minute.
+The scheduler is driven with synthetic db sequences, no audio involved. The clock ticks in 1/64 s steps (15.625 ms, about
+a chunk) so every time is exact in floating point and the beeps are expected at exact ticks.
+
+Run with: python -m benchmarks.check_alert
+"""
+from typing import List, Optional, Sequence, Tuple
+
+from hush.utils.audio.alert import AlertScheduler
+
+TICK = 1 / 64  # s
+TICK_MS = TICK * 1000
+MINUTE = 3840  # ticks
+THRESHOLD = -20.0
+LOUD = -10.0
+QUIET = -60.0
+
+
+def run(scheduler: AlertScheduler, segments: Sequence[Tuple[float, int]], gate: bool = True) -> List[int]:
+    """Feed the scheduler one db value every tick.
+
+    Parameters
+    ----------
+    scheduler : AlertScheduler
+        scheduler to drive
+    segments : Sequence[Tuple[float, int]]
+        db level and its duration in ticks, played one after the other
+    gate : bool
+        gate passed with every value (the VAD verdict)
+
+    Returns
+    -------
+    List[int]
+        ticks of the beeps
+    """
+    beeps = []
+    tick = 0
+    for db, duration in segments:
+        for _ in range(duration):
+            if scheduler.update(db, tick * TICK, gate=gate):
+                beeps.append(tick)
+            tick += 1
+    return beeps
+
+
+def check(name: str, beeps: List[int], expected: List[int], note: Optional[str] = None):
+    ok = beeps == expected
+    print(f"{name:<40} {len(beeps):>3} beep(s) {'ok' if ok else 'FAILED'}{f' ({note})' if note else ''}")
+    assert ok, f"{name}: expected beeps at {expected}, got {beeps}"
+
+
+def check_attack():
+    # the level must stay over the threshold for the whole attack time, the first beep is at the end of it
+    s = AlertScheduler(THRESHOLD, attack_ms=8 * TICK_MS, cooldown_ms=64 * TICK_MS)
+    check("attack: sustained", run(s, [(QUIET, 16), (LOUD, 32)]), [24], "8 ticks after the level rose")
+
+    s = AlertScheduler(THRESHOLD, attack_ms=8 * TICK_MS, cooldown_ms=64 * TICK_MS)
+    check("attack: bursts shorter than attack", run(s, [(LOUD, 7), (QUIET, 1)] * 20), [])
+
+    s = AlertScheduler(THRESHOLD, attack_ms=0, cooldown_ms=64 * TICK_MS)
+    check("attack: gated by the VAD", run(s, [(LOUD, 32)], gate=False), [])
+
+
+def check_release():
+    # once active, a dip that stays within release_db of the threshold does not release the alert
+    s = AlertScheduler(THRESHOLD, attack_ms=8 * TICK_MS, release_db=6, cooldown_ms=32 * TICK_MS)
+    beeps = run(s, [(LOUD, 16), (THRESHOLD - 3, 32), (LOUD, 16)])
+    check("release: dip within hysteresis", beeps, [8, 40], "beeps on, no new attack")
+
+    # without hysteresis the same dip releases the alert, the rise after it needs a full attack again
+    s = AlertScheduler(THRESHOLD, attack_ms=8 * TICK_MS, release_db=0, cooldown_ms=32 * TICK_MS)
+    beeps = run(s, [(LOUD, 16), (THRESHOLD - 3, 32), (LOUD, 16)])
+    check("release: same dip without hysteresis", beeps, [8, 56], "new attack after the dip")
+
+    # a drop past release_db releases it too, even a short one
+    s = AlertScheduler(THRESHOLD, attack_ms=8 * TICK_MS, release_db=6, cooldown_ms=4 * TICK_MS)
+    beeps = run(s, [(LOUD, 16), (THRESHOLD - 7, 1), (LOUD, 16)])
+    check("release: drop past hysteresis", beeps, [8, 12, 25, 29])
+
+
+def check_cooldown():
+    s = AlertScheduler(THRESHOLD, cooldown_ms=32 * TICK_MS)
+    check("cooldown: 500 ms over 3 s", run(s, [(LOUD, 192)]), [0, 32, 64, 96, 128, 160])
+
+    # the cooldown also holds across a release, a new attack does not beep before it ran out
+    s = AlertScheduler(THRESHOLD, cooldown_ms=64 * TICK_MS)
+    check("cooldown: across a release", run(s, [(LOUD, 8), (QUIET, 8), (LOUD, 64)]), [0, 64])
+
+
+def check_max_per_minute():
+    # 3 per minute on a 1 s cooldown: 3 beeps, then nothing until the first one is a minute old
+    s = AlertScheduler(THRESHOLD, cooldown_ms=64 * TICK_MS, max_per_minute=3)
+    beeps = run(s, [(LOUD, 2 * MINUTE + 640)])
+    expected = [m * MINUTE + i * 64 for m in range(3) for i in range(3)]
+    check("max per minute: 3 over 130 s", beeps, expected)
+
+    s = AlertScheduler(THRESHOLD, cooldown_ms=64 * TICK_MS, max_per_minute=0)
+    beeps = run(s, [(LOUD, 2 * MINUTE + 640)])
+    check("max per minute: 0 is unlimited", beeps, list(range(0, 2 * MINUTE + 640, 64)))
+
+
+def main():
+    check_attack()
+    check_release()
+    check_cooldown()
+    check_max_per_minute()
+    print("all alert scheduler checks passed")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,4 @@
+def main():
+    from .__main__ import main as _main
+
+    _main()
@@ -1,4 +1,61 @@
-from .app import main
+from argparse import ArgumentParser
+
+from .utils import startup  # noqa: F401, first so the startup time is measured from here
+
+
+def main():
+    parser = ArgumentParser(prog="hush", description="Hush, keep quiet!")
+    parser.add_argument(
+        "--headless", action="store_true", help="Run only the loudness engine and beeper, without the window and tray"
+    )
+    parser.add_argument(
+        "--tray",
+        action="store_true",
+        help="Start hidden in the tray and start monitoring right away, the window is only built when first opened",
+    )
+    parser.add_argument(
+        "--replay",
+        metavar="FILE",
+        help="With --headless, feed a recording (wav, or flac with soundfile) in real time instead of the microphone",
+    )
+    parser.add_argument(
+        "--synthetic",
+        choices=["silence", "tone", "noise"],
+        help="With --headless, feed a generated signal instead of the microphone",
+    )
+    parser.add_argument(
+        "--profile-startup",
+        action="store_true",
+        help="Run with the other options in a child process, report the import times and the time to the first audio chunk",
+    )
+    subparsers = parser.add_subparsers(dest="command")
+    parser_analyze = subparsers.add_parser("analyze", help="Analyze recordings offline with the same pipeline")
+
+    # the entry points are imported lazily so that headless and analyze never load tkinter, PIL or pystray
+    from .analyze import add_arguments
+
+    add_arguments(parser_analyze)
+    args = parser.parse_args()
+
+    if args.profile_startup:
+        import sys
+
+        startup.profile_startup([a for a in sys.argv[1:] if a != "--profile-startup"])
+        return
+
+    if args.command == "analyze":
+        from .analyze import main as analyze_main
+
+        analyze_main(args)
+    elif args.headless:
+        from .headless import main as headless_main
+
+        headless_main(args.replay, args.synthetic)
+    else:
+        from .app import main as app_main
+
+        app_main(args.tray)
+
 
 if __name__ == "__main__":
     main()
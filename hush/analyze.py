@@ -0,0 +1,181 @@
+import csv
+import json
+import os
+from time import perf_counter
+from typing import Dict, List, Optional
+
+from .custom_logging import logger
+
+
+class SettingCache:
+    """
+    In memory stand in for SettingJson, nothing is written to setting.json. Picklable so it can be sent to worker
+    processes.
+    """
+    def __init__(self, cache: dict):
+        self.cache = cache
+
+    def save(self, data: dict):
+        self.cache = data
+
+    def save_key(self, key: str, value):
+        self.cache[key] = value
+
+
+def analysis_rate(sample_rate: int, setting: dict) -> int:
+    """
+    Rate to analyze a recording at. The VAD and the weighting filters only run at 8, 16, 32 and 48 kHz, other rates are
+    resampled to the next supported one (44.1 kHz to 48 kHz) when either is on
+    """
+    from .utils.audio.weighting import SUPPORTED_RATES
+
+    if sample_rate in SUPPORTED_RATES or (setting["vad_mode"] == "Off" and setting["weighting"] == "Off"):
+        return sample_rate
+    return min((r for r in SUPPORTED_RATES if r >= sample_rate), default=SUPPORTED_RATES[-1])
+
+
+def open_recording(path: str, setting: dict, chunk_size: int = 480, realtime: bool = True):
+    """
+    `WavSource` of a recording, resampled to a rate the VAD and the weighting filters accept when needed
+    """
+    from .utils.audio.source import WavSource, read_file_info
+
+    file_rate, _ = read_file_info(path)
+    sample_rate = analysis_rate(file_rate, setting)
+    if sample_rate != file_rate:
+        logger.info(f"{os.path.basename(path)}: resampling from {file_rate} to {sample_rate} Hz for the VAD and weighting")
+    return WavSource(path, chunk_size, realtime, sample_rate)
+
+
+def analyze_file(path: str, setting: dict, chunk_size: int, timeline_path: Optional[str], fmt: str) -> Dict:
+    """Stream a recording through the same db, VAD and alert pipeline as the live engine.
+
+    Parameters
+    ----------
+    path : str
+        audio file to analyze
+    setting : dict
+        setting cache to use (threshold, vad mode, weighting, beep options)
+    chunk_size : int
+        frames per chunk, same meaning as the stream chunk size
+    timeline_path : str, optional
+        where to write the per chunk timeline, None to skip it
+    fmt : str
+        timeline format, csv or jsonl
+
+    Returns
+    -------
+    Dict
+        summary of the file
+    """
+    from .engine import HushEngine
+
+    start = perf_counter()
+    source = open_recording(path, setting, chunk_size, realtime=False)
+    engine = HushEngine(SettingCache(setting))
+    monitor = engine.add_monitor(source.sample_rate, source.channels, source.name)
+
+    threshold = setting["beep_when_reach"]
+    over_time, peak_db, beeps = 0.0, float("-inf"), 0
+    f_out = open(timeline_path, "w", encoding="utf-8", newline="") if timeline_path else None
+    writer = csv.writer(f_out) if f_out and fmt == "csv" else None
+    if writer:
+        writer.writerow(["time", "db", "is_speech", "alerting", "beep"])
+
+    try:
+        for chunk in source.chunks():
+            t = monitor.audio_time
+            result = engine.process(chunk)
+            duration = monitor.audio_time - t
+
+            peak_db = max(peak_db, result.db)
+            if result.db >= threshold and result.is_speech is not False:
+                over_time += duration
+            beeps += result.beep
+
+            if writer:
+                writer.writerow([f"{t:.3f}", f"{result.db:.2f}", result.is_speech, result.alerting, result.beep])
+            elif f_out:
+                row = {
+                    "time": round(t, 3),
+                    "db": round(result.db, 2),
+                    "is_speech": result.is_speech,
+                    "alerting": result.alerting,
+                    "beep": result.beep,
+                }
+                f_out.write(json.dumps(row) + "\n")
+    finally:
+        if f_out:
+            f_out.close()
+
+    elapsed = perf_counter() - start
+    return {
+        "file": path,
+        "sample_rate": source.file_rate,
+        "resampled_to": source.sample_rate if source.sample_rate != source.file_rate else None,
+        "duration": round(monitor.audio_time, 3),
+        "time_over_threshold": round(over_time, 3),
+        "peak_db": round(peak_db, 2),
+        "beeps": beeps,
+        "speed": round(monitor.audio_time / elapsed, 1) if elapsed > 0 else 0,
+    }
+
+
+def add_arguments(parser):
+    parser.add_argument("files", nargs="+", help="WAV or FLAC recordings to analyze")
+    parser.add_argument("--threshold", type=float, help="Beep threshold in db, defaults to the saved beep_when_reach")
+    parser.add_argument("--vad", choices=["Off", "1", "2", "3"], help="VAD mode, defaults to the saved setting")
+    parser.add_argument("--weighting", choices=["Off", "A", "K"], help="Loudness weighting, defaults to the saved setting")
+    parser.add_argument("--chunk", type=int, default=480, help="Frames per chunk (default: 480)")
+    parser.add_argument("--format", choices=["csv", "jsonl"], default="csv", help="Timeline format (default: csv)")
+    parser.add_argument("--out-dir", default=".", help="Where to write the timelines (default: current directory)")
+    parser.add_argument("--no-timeline", action="store_true", help="Only print the summary")
+    parser.add_argument("--summary-json", help="Also write the summaries to this json file")
+    parser.add_argument("--jobs", type=int, default=os.cpu_count(), help="Number of worker processes")
+
+
+def main(args):
+    """
+    Analyze recordings offline, fanning out multiple files over a process pool
+    """
+    from concurrent.futures import ProcessPoolExecutor
+
+    from .globals import sj
+
+    setting = dict(sj.cache)
+    setting["extra_devices"] = []
+    if args.threshold is not None:
+        setting["beep_when_reach"] = args.threshold
+    if args.vad is not None:
+        setting["vad_mode"] = args.vad
+    if args.weighting is not None:
+        setting["weighting"] = args.weighting
+
+    jobs = []
+    for path in args.files:
+        timeline = None
+        if not args.no_timeline:
+            name = os.path.splitext(os.path.basename(path))[0]
+            timeline = os.path.join(args.out_dir, f"{name}.timeline.{args.format}")
+        jobs.append((path, setting, args.chunk, timeline, args.format))
+
+    logger.info(f"Analyzing {len(jobs)} file(s), threshold {setting['beep_when_reach']} db")
+    summaries: List[Dict] = []
+    with ProcessPoolExecutor(max_workers=max(1, min(args.jobs or 1, len(jobs)))) as executor:
+        futures = [executor.submit(analyze_file, *job) for job in jobs]
+        for job, future in zip(jobs, futures):
+            try:
+                summaries.append(future.result())
+            except Exception as e:
+                logger.error(f"Failed to analyze {job[0]}: {e}")
+
+    print(f"{'file':<40} {'duration':>10} {'over':>10} {'peak db':>8} {'beeps':>6} {'speed':>8}")
+    for s in summaries:
+        print(
+            f"{os.path.basename(s['file']):<40} {s['duration']:>9.1f}s {s['time_over_threshold']:>9.1f}s "
+            f"{s['peak_db']:>8.2f} {s['beeps']:>6} {s['speed']:>7.0f}x"
+        )
+
+    if args.summary_json:
+        with open(args.summary_json, "w", encoding="utf-8") as f:
+            json.dump(summaries, f, ensure_ascii=False, indent=4)
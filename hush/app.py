@@ -1,26 +1,33 @@
 import os
 from threading import Thread
-from tkinter import Tk, ttk, Menu, BooleanVar
+from time import monotonic
+from tkinter import Tk, ttk, Menu, BooleanVar, StringVar, simpledialog
 from signal import SIGINT, signal
-from typing import Dict, Literal  # Import the signal module to handle Ctrl+C
+from typing import Dict, Literal, Optional  # Import the signal module to handle Ctrl+C
 
-import pyaudio
 from PIL import Image, ImageDraw
 from pystray import Icon as icon, Menu as menu, MenuItem as item
-from pygame import mixer
-from requests import get
-from webrtcvad import Vad
 
 from .components.tooltip import tk_tooltip, tk_tooltips
 from .components.audio import AudioMeter
+from .components.history import HistoryGraph
 from .components.message import mbox, ask_file_sound
 
+from .engine import HushEngine, MeterResult
+from .utils.audio.alert import AGGREGATIONS
+from .utils.audio.ballistics import BALLISTICS
+from .utils.audio.history import HISTORY_WINDOWS, LevelHistory
+from .utils.audio.beep import Beeper
+from .utils.channel import UiChannel
 from .utils.audio.device import (
-    get_default_host_api, get_default_input_device, get_device_details, get_db, get_host_apis, get_input_devices
-)
-from .utils.helper import (
-    OpenUrl, bind_focus_recursively, emoji_img, get_channel_int, nativeNotify, popup_menu, similar, start_file
+    CHANNEL_NAMES, get_channel_int, get_default_host_api, get_default_input_device, get_host_apis, get_input_devices
 )
+from .utils.audio.capability import SAMPLE_RATES, capabilities
+from .utils.audio.latency import LATENCY_PROFILES, PULL_READ_MS, AlertLatency
+from .utils.audio.registry import registry
+from .utils.audio.session import session
+from .utils.startup import log_startup
+from .utils.helper import OpenUrl, bind_focus_recursively, emoji_img, nativeNotify, popup_menu, similar, start_file
 
 from ._path import app_icon, app_icon_missing, beep_default, dir_log
 from ._version import __version__
@@ -30,6 +37,10 @@ from .custom_logging import logger
 APP_NAME = "Hush"
 MAX_THRESHOLD = 1
 MIN_THRESHOLD = -81
+HISTORY_HEIGHT = 70
+TRAY_LEVEL_STEPS = 8  # level frames of the tray icon, the first one is silence
+TRAY_MIN_DB = -60  # level shown as an empty bar in the tray icon
+TRAY_MAX_FPS = 4
 
 
 # Function to handle Ctrl+C and exit just like clicking the exit button
@@ -44,12 +55,21 @@ signal(SIGINT, signal_handler)  # Register the signal handler for Ctrl+C
 
 class AppTray:
     """
-    Tray app
+    Tray app.
+
+    While monitoring, the icon shows the current level as a bar and turns red while alerting. Every frame is rendered
+    once when the tray is created, an update only swaps in the cached image and only when the frame changes, at most
+    `TRAY_MAX_FPS` times per second.
     """
     def __init__(self):
         self.icon: icon = None  # type: ignore
         self.menu: menu = None  # type: ignore
         self.menu_items = None  # type: ignore
+        self.idle_frame = None
+        self.level_frames = []
+        self.alert_frame = None
+        self.frame_key = None  # (step, alerting) of the frame shown, None when idle
+        self.last_swap = 0.0
         gc.tray = self
         self.create_tray()
         logger.info("Tray created")
@@ -64,12 +84,59 @@ class AppTray:
 
         return image
 
+    def render_frames(self, base):
+        """
+        Pre render the level frames and the alert frame on top of the base icon
+        """
+        size = 64
+        self.idle_frame = base.convert("RGBA").resize((size, size))
+        bar_w = size // 5
+        self.level_frames = []
+        for step in range(TRAY_LEVEL_STEPS):
+            frame = self.idle_frame.copy()
+            dc = ImageDraw.Draw(frame)
+            dc.rectangle((size - bar_w, 0, size - 1, size - 1), fill="black")
+            height = round(step / (TRAY_LEVEL_STEPS - 1) * (size - 2))
+            if height:
+                color = "lime" if step < TRAY_LEVEL_STEPS * 0.6 else "yellow" if step < TRAY_LEVEL_STEPS * 0.85 else "red"
+                dc.rectangle((size - bar_w + 1, size - 1 - height, size - 2, size - 2), fill=color)
+            self.level_frames.append(frame)
+
+        self.alert_frame = self.idle_frame.copy()
+        dc = ImageDraw.Draw(self.alert_frame)
+        dc.rectangle((0, 0, size - 1, size - 1), outline="red", width=size // 8)
+        dc.rectangle((size - bar_w, 0, size - 1, size - 1), fill="red")
+
+    def set_level(self, db: float, alerting: bool):
+        """
+        Show the level in the icon, can be called for every chunk from any thread
+        """
+        step = round(min(max((db - TRAY_MIN_DB) / -TRAY_MIN_DB, 0), 1) * (TRAY_LEVEL_STEPS - 1))
+        key = (step, alerting)
+        if key == self.frame_key:
+            return
+
+        now = monotonic()
+        # the start and end of an alert are always shown, the beeps are already rate limited
+        alert_changed = self.frame_key is None or self.frame_key[1] != alerting
+        if not alert_changed and now - self.last_swap < 1 / TRAY_MAX_FPS:
+            return
+
+        self.frame_key = key
+        self.last_swap = now
+        self.icon.icon = self.alert_frame if alerting else self.level_frames[step]
+
+    def reset_level(self):
+        self.frame_key = None
+        self.icon.icon = self.idle_frame
+
     # -- Create tray
     def create_tray(self):
         try:
             trayIco = Image.open(app_icon)
         except Exception:
             trayIco = self.create_image(64, 64, "black", "white")
+        self.render_frames(trayIco)
 
         self.menu_items = (
             item(f"{APP_NAME} {__version__}", lambda *args: None, enabled=False),  # do nothing
@@ -93,21 +160,27 @@ class AppTray:
 
 
 class Hush:
-    def __init__(self):
+    """
+    Main window. With `tray_first` the window stays hidden and monitoring starts right away, the widgets are only built
+    the first time the window is shown.
+    """
+    def __init__(self, tray_first=False):
         gc.mw = self
+        self.built = False
         self.checking = False
         self.notified = False
         self.max_v = MAX_THRESHOLD
         self.min_v = MIN_THRESHOLD
-        self.vad = Vad() if sj.cache["vad_mode"] == "Off" else Vad(int(sj.cache["vad_mode"]))
-        self.is_speech = False
-        self.detail_device = None
-        self.p_rec = None
-        self.stream_rec = None
-        self.streaming = False
+        self.engine = HushEngine(
+            sj, on_result=self.hush_meter, on_alert=self.on_alert, ballistics=True, on_stream_state=self.on_stream_state
+        )
+        self.beeper = Beeper(sj)
+        self.alert_latency = AlertLatency()
+        self.history = LevelHistory()  # recorded even while the graph is hidden, so it has data once shown
+        self.history_shown = False
 
         self.root = Tk()
-        self.wrench_emoji = emoji_img(16, "     🛠️")
+        self.ui_channel = UiChannel(self.root, self.apply_ui_update, sj.cache["meter_max_fps"])
 
         self.root.title(APP_NAME)
         self.root.geometry(sj.cache["mw_size"])
@@ -116,6 +189,29 @@ class Hush:
         self.root.protocol("WM_DELETE_WINDOW", self.close_window)
         if not app_icon_missing:
             self.root.iconbitmap(app_icon)
+        self.root.bind("<Map>", lambda event: self.on_visibility(event, True), add="+")
+        self.root.bind("<Unmap>", lambda event: self.on_visibility(event, False), add="+")
+
+        gc.running_after_id = self.root.after(1000, self.is_running_poll)
+        if not sj.cache["keep_log"]:
+            self.clear_log(on_start=True)
+
+        # tray first needs a device that was already chosen in the window, otherwise there is nothing to monitor
+        if tray_first and sj.cache["device"]:
+            self.root.withdraw()
+            self.notified = True  # the user asked for it, no need to tell that it runs in the background
+            Thread(target=self.call_hush_meter, daemon=True, args=[True]).start()
+        else:
+            self.build_window()
+
+    def build_window(self):
+        """
+        Create the widgets of the main window
+        """
+        if self.built:
+            return
+
+        self.wrench_emoji = emoji_img(16, "     🛠️")
 
         # menu
         self.menu = Menu(self.root)
@@ -123,6 +219,13 @@ class Hush:
 
         self.file_menu = Menu(self.menu, tearoff=False)
         self.file_menu.add_command(label="Hide", command=self.close_window)
+        self.var_start_in_tray = BooleanVar(self.root, sj.cache["start_in_tray"])
+        self.file_menu.add_checkbutton(
+            label="Start in tray and monitor right away",
+            variable=self.var_start_in_tray,
+            command=lambda: sj.save_key("start_in_tray", self.var_start_in_tray.get())
+        )
+        self.file_menu.add_separator()
         self.file_menu.add_command(label="Exit", command=self.quit_app)
         self.menu.add_cascade(label="File", menu=self.file_menu)
 
@@ -130,6 +233,23 @@ class Hush:
         self.beep_submenu = Menu(self.option_menu, tearoff=False)
         self.beep_submenu.add_command(label="Change beep sound", command=lambda: self.change_beep())
         self.beep_submenu.add_command(label="Set to default", command=lambda: self.beep_set_default())
+        self.beep_submenu.add_separator()
+        self.beep_submenu.add_command(
+            label="Attack time",
+            command=lambda: self.ask_beep_setting("beep_attack_ms", "Time (ms) over the threshold before beeping"),
+        )
+        self.beep_submenu.add_command(
+            label="Release hysteresis",
+            command=lambda: self.ask_beep_setting("beep_release_db", "Drop (db) below the threshold to stop beeping"),
+        )
+        self.beep_submenu.add_command(
+            label="Cooldown",
+            command=lambda: self.ask_beep_setting("beep_cooldown_ms", "Minimum time (ms) between beeps"),
+        )
+        self.beep_submenu.add_command(
+            label="Max beep rate",
+            command=lambda: self.ask_beep_setting("beep_max_per_minute", "Maximum beeps per minute (0 is unlimited)"),
+        )
 
         self.log_submenu = Menu(self.option_menu, tearoff=False)
         self.var_keep_log = BooleanVar(self.root, sj.cache["keep_log"])
@@ -148,8 +268,102 @@ class Hush:
         self.audio_submenu.add_checkbutton(
             label="Turn off audio visualization", variable=self.var_no_visual, command=lambda: self.toggle_visual()
         )
+        self.var_tray_level = BooleanVar(self.root, sj.cache["tray_level"])
+        self.audio_submenu.add_checkbutton(
+            label="Show the level in the tray icon", variable=self.var_tray_level, command=lambda: self.set_tray_level()
+        )
+        self.audio_submenu.add_separator()
+        self.var_meter_ballistics = StringVar(self.root, sj.cache["meter_ballistics"])
+        for value in BALLISTICS:
+            self.audio_submenu.add_radiobutton(
+                label="Show the level of every chunk" if value == "Off" else f"{value} meter with peak hold",
+                value=value,
+                variable=self.var_meter_ballistics,
+                command=lambda: sj.save_key("meter_ballistics", self.var_meter_ballistics.get())
+            )
+        self.audio_submenu.add_separator()
+        self.var_history_window = StringVar(self.root, str(sj.cache["history_window"]))
+        for window in (0, ) + HISTORY_WINDOWS:
+            self.audio_submenu.add_radiobutton(
+                label=f"History graph, last {window // 60} min" if window else "No history graph",
+                value=str(window),
+                variable=self.var_history_window,
+                command=lambda: self.set_history_window(int(self.var_history_window.get()))
+            )
+        self.audio_submenu.add_separator()
+        self.var_meter_max_fps = StringVar(self.root, str(sj.cache["meter_max_fps"]))
+        for fps in (10, 15, 30, 60):
+            self.audio_submenu.add_radiobutton(
+                label=f"Refresh at most {fps} times per second",
+                value=str(fps),
+                variable=self.var_meter_max_fps,
+                command=lambda: self.set_meter_max_fps()
+            )
+
+        self.weighting_submenu = Menu(self.option_menu, tearoff=False)
+        self.var_weighting = StringVar(self.root, sj.cache["weighting"])
+        for label, value in (("Off (unweighted)", "Off"), ("A-weighting", "A"), ("K-weighting (BS.1770)", "K")):
+            self.weighting_submenu.add_radiobutton(
+                label=label,
+                value=value,
+                variable=self.var_weighting,
+                command=lambda: sj.save_key("weighting", self.var_weighting.get())
+            )
+
+        self.latency_submenu = Menu(self.option_menu, tearoff=False)
+        self.var_latency_profile = StringVar(self.root, sj.cache["latency_profile"])
+        for profile in LATENCY_PROFILES.values():
+            self.latency_submenu.add_radiobutton(
+                label=f"{profile.name.capitalize().replace('-', ' ')} ({profile.chunk_ms} ms buffers)",
+                value=profile.name,
+                variable=self.var_latency_profile,
+                command=lambda: sj.save_key("latency_profile", self.var_latency_profile.get())
+            )
+        self.latency_submenu.add_separator()
+        self.var_pull_capture = BooleanVar(self.root, sj.cache["capture_mode"] == "pull")
+        self.latency_submenu.add_checkbutton(
+            label=f"Read {PULL_READ_MS} ms at once (fewer wakeups, higher latency)",
+            variable=self.var_pull_capture,
+            command=lambda: sj.save_key("capture_mode", "pull" if self.var_pull_capture.get() else "callback")
+        )
+        self.var_standby = BooleanVar(self.root, sj.cache["standby"])
+        self.latency_submenu.add_checkbutton(
+            label="Keep the stream ready when stopped (instant start)",
+            variable=self.var_standby,
+            command=self.standby_change
+        )
+        self.latency_submenu.add_separator()
+        self.latency_submenu.add_command(label="Applied on the next start", state="disabled")
+
+        self.reconnect_submenu = Menu(self.option_menu, tearoff=False)
+        self.fallback_device_submenu = Menu(self.reconnect_submenu, tearoff=False, postcommand=self.fallback_device_menu)
+        self.var_auto_reconnect = BooleanVar(self.root, sj.cache["auto_reconnect"])
+        self.var_fallback_device = StringVar(self.root, sj.cache["fallback_device"])
+        self.reconnect_submenu.add_checkbutton(
+            label="Reopen the mic when it is lost",
+            variable=self.var_auto_reconnect,
+            command=lambda: sj.save_key("auto_reconnect", self.var_auto_reconnect.get())
+        )
+        self.reconnect_submenu.add_cascade(label="Fallback device", menu=self.fallback_device_submenu)
+
+        self.multi_device_submenu = Menu(self.option_menu, tearoff=False)
+        self.extra_device_submenu = Menu(self.multi_device_submenu, tearoff=False, postcommand=self.extra_device_menu)
+        self.var_aggregation = StringVar(self.root, sj.cache["aggregation"])
+        self.multi_device_submenu.add_cascade(label="Also monitor", menu=self.extra_device_submenu)
+        self.multi_device_submenu.add_separator()
+        for value in AGGREGATIONS:
+            self.multi_device_submenu.add_radiobutton(
+                label=f"Beep on {value} device" if value != "all" else "Beep when all devices are loud",
+                value=value,
+                variable=self.var_aggregation,
+                command=lambda: sj.save_key("aggregation", self.var_aggregation.get())
+            )
 
         self.option_menu.add_cascade(label="Beep option", menu=self.beep_submenu)
+        self.option_menu.add_cascade(label="Loudness weighting", menu=self.weighting_submenu)
+        self.option_menu.add_cascade(label="Multiple devices", menu=self.multi_device_submenu)
+        self.option_menu.add_cascade(label="Device loss", menu=self.reconnect_submenu)
+        self.option_menu.add_cascade(label="Latency profile", menu=self.latency_submenu)
         self.option_menu.add_cascade(label="Audio meter", menu=self.audio_submenu)
         self.option_menu.add_cascade(label="Logger", menu=self.log_submenu)
         self.option_menu.add_command(label="Reset all setting to default", command=lambda: self.reset_all_setting())
@@ -192,6 +406,8 @@ class Hush:
         self.mf_2_3 = ttk.Frame(self.mf_2)
         self.mf_2_3.pack(side="top", fill="x", expand=True)
 
+        self.mf_2_5 = ttk.Frame(self.mf_2)  # history graph, packed before mf_2_4 when shown
+
         self.mf_2_4 = ttk.Frame(self.mf_2)
         self.mf_2_4.pack(side="top", fill="x", expand=True)
 
@@ -225,7 +441,7 @@ class Hush:
             image=self.wrench_emoji,
             compound="center",
             width=3,
-            command=lambda: popup_menu(self.root, self.menu_hostAPI, not self.streaming),
+            command=lambda: popup_menu(self.root, self.menu_hostAPI, not self.engine.streaming),
         )
         self.btn_config_hostAPI.pack(side="left", padx=(5, 10))
         self.menu_hostAPI = self.input_device_menu("hostAPI")
@@ -233,10 +449,10 @@ class Hush:
         self.lbl_sample_rate = ttk.Label(self.mf_1_1, text="Sample rate", font="TkDefaultFont 9 bold", width=10)
         self.lbl_sample_rate.pack(side="left", padx=5)
 
-        self.cb_sample_rate = ttk.Combobox(self.mf_1_1, values=["8000", "16000", "32000", "48000"], state="readonly")
+        self.cb_sample_rate = ttk.Combobox(self.mf_1_1, values=[str(r) for r in SAMPLE_RATES], state="readonly")
         self.cb_sample_rate.set(sj.cache["sample_rate"])
         self.cb_sample_rate.bind(
-            "<<ComboboxSelected>>", lambda _: sj.save_key("sample_rate", self.cb_sample_rate.get()) or self.hostAPI_change()
+            "<<ComboboxSelected>>", lambda _: self.sample_rate_change(self.cb_sample_rate.get()) or self.hostAPI_change()
         )
         self.cb_sample_rate.pack(side="left", padx=5, expand=True, fill="x")
 
@@ -245,7 +461,7 @@ class Hush:
         self.lbl_device.pack(side="left", padx=5)
 
         self.cb_device = ttk.Combobox(self.mf_1_2, values=[], state="readonly")
-        self.cb_device.bind("<<ComboboxSelected>>", lambda _: sj.save_key("device", self.cb_device.get()))
+        self.cb_device.bind("<<ComboboxSelected>>", lambda _: self.save_device(self.cb_device.get()))
         self.cb_device.pack(side="left", padx=5, expand=True, fill="x")
 
         self.btn_config_device = ttk.Button(
@@ -253,7 +469,7 @@ class Hush:
             image=self.wrench_emoji,
             compound="center",
             width=3,
-            command=lambda: popup_menu(self.root, self.menu_device, not self.streaming),
+            command=lambda: popup_menu(self.root, self.menu_device, not self.engine.streaming),
         )
         self.btn_config_device.pack(side="left", padx=(5, 10))
         self.menu_device = self.input_device_menu("device")
@@ -261,7 +477,7 @@ class Hush:
         self.lbl_channel = ttk.Label(self.mf_1_2, text="Channel", font="TkDefaultFont 9 bold", width=10)
         self.lbl_channel.pack(side="left", padx=5)
 
-        self.cb_channel = ttk.Combobox(self.mf_1_2, values=["Mono", "Stereo"], state="readonly")
+        self.cb_channel = ttk.Combobox(self.mf_1_2, values=list(CHANNEL_NAMES.values()), state="readonly")
         self.cb_channel.set(sj.cache["channel"])
         self.cb_channel.bind("<<ComboboxSelected>>", lambda _: sj.save_key("channel", self.cb_channel.get()))
         self.cb_channel.pack(side="left", padx=5, expand=True, fill="x")
@@ -339,9 +555,24 @@ class Hush:
             show_threshold=True,
             auto_resize=True,
             performance_mode=sj.cache["performance_mode"],
+            max_fps=sj.cache["meter_max_fps"],
         )
         self.audio_meter.pack(side="top", padx=5, pady=(5, 0), expand=True, fill="both")
 
+        # -- mf_2_5
+        self.history_graph = HistoryGraph(
+            self.mf_2_5,
+            self.root,
+            self.history,
+            window=sj.cache["history_window"] or HISTORY_WINDOWS[0],
+            threshold=sj.cache["beep_when_reach"],
+            min=MIN_THRESHOLD,
+            max=MAX_THRESHOLD,
+            height=HISTORY_HEIGHT - 10,
+            bg="white",
+        )
+        self.history_graph.pack(side="top", padx=5, pady=(5, 0), expand=True, fill="both")
+
         # -- mf_2_4
         self.divider_2 = ttk.Separator(self.mf_2_4, orient="horizontal")
         self.divider_2.pack(side="left", fill="x", expand=True, padx=5, pady=(5, 0))
@@ -357,35 +588,60 @@ class Hush:
         self.lbl_beep_status = ttk.Label(self.mf_3_1_l, text="")
         self.lbl_beep_status.pack(side="left", padx=0)
 
+        self.lbl_latency = ttk.Label(self.mf_3_1_l, text="")
+        self.lbl_latency.pack(side="left", padx=5)
+        self.tooltip_latency = tk_tooltip(self.lbl_latency, "Capture to beep latency of the last alert")
+
         # -- mf_3_1_r
         self.btn_toggle_start_hush = ttk.Button(self.mf_3_1_r, text="Start", command=self.start_hush)
         self.btn_toggle_start_hush.pack(side="right", padx=5)
 
         # --------------------------
+        self.built = True
         bind_focus_recursively(self.root, self.root)
         self.cb_input_device_init()
-        self.init_mixer_with_check()
         self.slider_beep_when.set(sj.cache["beep_when_reach"])  # after everything is set
-        gc.running_after_id = self.root.after(1000, self.is_running_poll)
         if sj.cache["checkUpdateOnStart"]:
             self.check_for_update(onStart=True)
         if sj.cache["no_visual"]:
             self.no_visual()
-        if not sj.cache["keep_log"]:
-            self.clear_log(on_start=True)
+        if sj.cache["history_window"]:
+            self.set_history_window(sj.cache["history_window"], on_start=True)
+        if self.engine.streaming:  # started from the tray before the window existed
+            self.set_streaming_widgets(True)
+        log_startup("main window built")
 
     # ----------------------------------------------------------------------
     def show_window(self):
+        self.root.after(0, self.build_window)
         self.root.after(0, self.root.deiconify)
+        self.root.after(0, lambda: self.set_visible(True))
 
     def close_window(self):
         if not self.notified:
             nativeNotify("Hush is still running", "Hush is still running in the background")
             self.notified = True
 
+        self.set_visible(False)
         self.root.withdraw()
 
+    def on_visibility(self, event, visible: bool):
+        """
+        Minimizing, restoring, withdrawing and showing the window, the events of the child widgets are ignored
+        """
+        if event.widget is self.root:
+            self.set_visible(visible)
+
+    def set_visible(self, visible: bool):
+        if not self.built:
+            return
+        self.ui_channel.set_paused(not visible)
+        self.audio_meter.set_visible(visible)
+        self.history_graph.set_visible(visible)
+
     def save_win_size(self):
+        if not self.built:  # never shown, the size of the hidden window means nothing
+            return
         w = self.root.winfo_width()
         h = self.root.winfo_height()
         sj.save_key("mw_size", f"{w}x{h}")
@@ -395,8 +651,9 @@ class Hush:
         self.root.after_cancel(gc.running_after_id)
 
         # stop the audio
-        mixer.quit()
+        self.beeper.quit()
         self.close_hush_meter()
+        session.terminate()
 
         if gc.tray:
             gc.tray.icon.stop()
@@ -466,8 +723,7 @@ class Hush:
         f = ask_file_sound("Select the sound file that you want to use as beep sound", self.root)
         if f:
             sj.save_key("custom_beep_path", f)
-            self.init_mixer_with_check()
-            mixer.music.load(f)
+            self.beeper.load(f)
             mbox("Success", "Beep sound has been changed successfully", 0, self.root)
 
     def beep_set_default(self):
@@ -482,10 +738,17 @@ class Hush:
             self.root,
         ):
             sj.save_key("custom_beep_path", "")
-            self.init_mixer_with_check()
-            mixer.music.load(beep_default)
+            self.beeper.load(beep_default)
             mbox("Success", "Beep sound has been set to default", 0, self.root)
 
+    def ask_beep_setting(self, key: str, prompt: str):
+        """
+        Ask for a new value of a beep setting, the engine picks it up on the next chunk
+        """
+        value = simpledialog.askfloat("Beep option", prompt, initialvalue=sj.cache[key], minvalue=0, parent=self.root)
+        if value is not None:
+            sj.save_key(key, value)
+
     def reset_all_setting(self):
         if mbox(
             "Confirmation",
@@ -512,6 +775,8 @@ class Hush:
         Will check previous options and set to default if not available.
         If default is not available, will show a warning.
         """
+        registry.resolve_saved(sj)  # find the saved devices again if they were renumbered, before checking the list
+
         success, host_detail = get_default_host_api()
         if success:
             assert isinstance(host_detail, Dict)
@@ -520,7 +785,9 @@ class Hush:
             defaultHost = ""
 
         self.cb_hostAPI["values"] = get_host_apis()
-        self.cb_device["values"] = get_input_devices(defaultHost)
+        # list the devices of the saved host API, the saved mic is looked up there
+        hostAPI = sj.cache["hostAPI"] if sj.cache["hostAPI"] in self.cb_hostAPI["values"] else defaultHost
+        self.cb_device["values"] = get_input_devices(hostAPI)
 
         # Setting previous options
         if sj.cache["hostAPI"] not in self.cb_hostAPI["values"]:
@@ -533,6 +800,7 @@ class Hush:
             self.device_set_default()
         else:
             self.cb_device.set(sj.cache["device"])
+            self.update_format_options()
 
     def input_device_menu(self, theType: Literal["hostAPI", "device"]):
         """
@@ -560,7 +828,7 @@ class Hush:
         }
 
         menu = Menu(self.btn_config_hostAPI, tearoff=0)
-        menu.add_command(label="Refresh", command=refreshDict[theType])
+        menu.add_command(label="Refresh", command=lambda: refreshDict[theType](rescan=True))
         menu.add_command(label="Set to default", command=setDefaultDict[theType])
 
         success, default_host = getDefaultDict[theType]()
@@ -571,6 +839,55 @@ class Hush:
 
         return menu
 
+    def extra_device_menu(self):
+        """
+        Fill the "Also monitor" menu with the current device list, the selected device is always monitored
+        """
+        self.extra_device_submenu.delete(0, "end")
+        state = "disabled" if self.engine.streaming else "normal"
+        for device in self.cb_device["values"]:
+            if device == self.cb_device.get() or device.startswith(("[WARNING]", "[ERROR]")):
+                continue
+            var = BooleanVar(self.root, device in sj.cache["extra_devices"])
+            self.extra_device_submenu.add_checkbutton(
+                label=device,
+                variable=var,
+                state=state,
+                command=lambda d=device, v=var: self.toggle_extra_device(d, v.get()),
+            )
+
+        if self.extra_device_submenu.index("end") is None:
+            self.extra_device_submenu.add_command(label="No other device found", state="disabled")
+
+    def fallback_device_menu(self):
+        """
+        Fill the "Fallback device" menu with the current device list, used when the lost device does not come back
+        """
+        self.fallback_device_submenu.delete(0, "end")
+        self.var_fallback_device.set(sj.cache["fallback_device"])
+        for device in ("", *self.cb_device["values"]):
+            if device.startswith(("[WARNING]", "[ERROR]")):
+                continue
+            self.fallback_device_submenu.add_radiobutton(
+                label=device or "System default",
+                value=device,
+                variable=self.var_fallback_device,
+                command=lambda: self.save_fallback_device(self.var_fallback_device.get()),
+            )
+        self.fallback_device_submenu.add_separator()
+        self.fallback_device_submenu.add_command(label="Used until the next start", state="disabled")
+
+    def save_fallback_device(self, device: str):
+        sj.save_key("fallback_device", device)
+        registry.remember(sj)
+
+    def toggle_extra_device(self, device: str, enabled: bool):
+        devices = [d for d in sj.cache["extra_devices"] if d != device]
+        if enabled:
+            devices.append(device)
+        sj.save_key("extra_devices", devices)
+        registry.remember(sj)
+
     def hostAPI_change(self, _event=None):
         self.cb_device["values"] = get_input_devices(self.cb_hostAPI.get())
 
@@ -587,7 +904,10 @@ class Hush:
         else:
             self.cb_device.current(0)
 
-    def hostAPI_refresh(self, _event=None):
+    def hostAPI_refresh(self, _event=None, rescan=False):
+        if rescan:  # the lists are cached by the audio session, only rescan when asked to
+            self.close_standby()  # the session cannot rescan while a stream is open
+            session.refresh()
         self.cb_hostAPI["values"] = get_host_apis()
         # verify if the current hostAPI is still available
         if self.cb_hostAPI.get() not in self.cb_hostAPI["values"]:
@@ -618,7 +938,10 @@ class Hush:
         if not onInit:
             self.hostAPI_change()
 
-    def device_refresh(self, _event=None):
+    def device_refresh(self, _event=None, rescan=False):
+        if rescan:
+            self.close_standby()
+            session.refresh()
         self.cb_device["values"] = get_input_devices(self.cb_hostAPI.get())
         if self.cb_device.get() not in self.cb_device["values"]:
             self.cb_device.current(0)
@@ -651,13 +974,46 @@ class Hush:
                 self.cb_device.current(0)
             else:
                 self.cb_device.set(self.cb_device["values"][index])
-            sj.save_key("device", self.cb_device.get())
+            self.save_device(self.cb_device.get())
+
+    def save_device(self, device: str):
+        sj.save_key("device", device)
+        registry.remember(sj)
+        self.update_format_options(select_cheapest=True)
+
+    def sample_rate_change(self, sample_rate: str):
+        sj.save_key("sample_rate", sample_rate)
+        self.update_format_options()
+
+    def update_format_options(self, select_cheapest=False):
+        """
+        Only offer the sample rates and channels the selected device supports. With `select_cheapest`, or when the
+        saved format is not supported, switch to the cheapest supported one (16 kHz mono when possible)
+        """
+        record = registry.get_by_label(self.cb_device.get())
+        caps = capabilities.get(record) if record else None
+        if caps is None or not caps.supported:  # unknown, offer everything and let opening the stream report errors
+            self.cb_sample_rate["values"] = [str(r) for r in SAMPLE_RATES]
+            self.cb_channel["values"] = list(CHANNEL_NAMES.values())
+            return
+
+        sample_rate, channels = int(sj.cache["sample_rate"]), get_channel_int(sj.cache["channel"])
+        if select_cheapest or sample_rate not in caps.rates():
+            sample_rate, channels = caps.cheapest()  # type: ignore
+        elif not caps.supports(sample_rate, channels):
+            channels = caps.channels(sample_rate)[0]
+
+        self.cb_sample_rate["values"] = [str(r) for r in caps.rates()]
+        self.cb_channel["values"] = [CHANNEL_NAMES[c] for c in caps.channels(sample_rate)]
+        self.cb_sample_rate.set(str(sample_rate))
+        self.cb_channel.set(CHANNEL_NAMES[channels])
+        sj.save_key("sample_rate", str(sample_rate))
+        sj.save_key("channel", CHANNEL_NAMES[channels])
 
     def vad_mode_change(self, value=None):
         get = self.cb_vad_mode.get()
         sj.save_key("vad_mode", get)
-        if get != "Off":
-            self.vad.set_mode(int(get))
+        self.engine.set_vad_mode(get)
 
         self.lbl_vad_status["text"] = "VAD: Off" if get == "Off" else "VAD: On"
 
@@ -668,36 +1024,34 @@ class Hush:
         self.lbl_beep_when_value["text"] = f"{float(event):.2f} db"
         self.audio_meter.set_threshold(float(event))
         self.audio_meter.meter_update()
+        self.history_graph.set_threshold(float(event))
 
     def init_mixer_with_check(self):
-        try:
-            if mixer.get_init() is None:
-                logger.debug("Initializing mixer...")
-                music_file = sj.cache["custom_beep_path"] if sj.cache["custom_beep_path"] != "" else beep_default
-                mixer.init()
-                mixer.music.load(music_file)
-        except Exception as e:
-            logger.exception(e)
+        self.beeper.init_with_check()
 
     def quit_mixer(self):
-        try:
-            mixer.quit()
-        except Exception as e:
-            logger.exception(e)
+        self.beeper.quit()
 
-    def play_sound(self):
-        try:
-            mixer.music.set_volume(sj.cache["beep_volume"] / 100)
-            mixer.music.play(start=0.1)
-
-        except Exception as e:
-            logger.exception(e)
+    def play_sound(self) -> int:
+        return self.beeper.play()
 
     def set_performance_mode(self):
         x = self.var_performance_mode.get()
         self.audio_meter.set_performance_mode(x)
         sj.save_key("performance_mode", x)
 
+    def set_tray_level(self):
+        x = self.var_tray_level.get()
+        sj.save_key("tray_level", x)
+        if not x and gc.tray:
+            gc.tray.reset_level()
+
+    def set_meter_max_fps(self):
+        x = int(self.var_meter_max_fps.get())
+        self.audio_meter.set_max_fps(x)
+        self.ui_channel.set_max_fps(x)
+        sj.save_key("meter_max_fps", x)
+
     def toggle_visual(self):
         val = self.var_no_visual.get()
         if val:
@@ -708,41 +1062,114 @@ class Hush:
 
     def no_visual(self):
         self.audio_meter.stop()
+        self.history_graph.stop()
         self.mf_2_3.pack_forget()
 
     def with_visual(self):
         self.audio_meter.start()
+        self.history_graph.start()
         self.mf_2_3.pack(side="top", fill="x", expand=True)
 
-    def close_hush_meter(self):
-        self.streaming = False
-        self.lbl_vad_status["text"] = "VAD: Off" if sj.cache["vad_mode"] == "Off" else "VAD: On"
-        # STOP
-        self.btn_toggle_start_hush["text"] = "Start"
-        self.cb_device["state"] = "readonly"
-        self.cb_hostAPI["state"] = "readonly"
-        self.cb_sample_rate["state"] = "readonly"
-        self.cb_channel["state"] = "readonly"
-
-        self.audio_meter.set_db(self.min_v)
-        self.audio_meter.meter_update()
-        self.audio_meter.stop()
-        try:
-            if self.stream_rec:
-                self.stream_rec.stop_stream()
-                self.stream_rec.close()
-                self.stream_rec = None
-
-            if self.p_rec:
-                self.p_rec.terminate()
-                self.p_rec = None
-        except Exception as e:
-            logger.exception(e)
+    def set_history_window(self, window: int, on_start=False):
+        """
+        Show the history graph of the last `window` seconds, 0 hides it. The window grows or shrinks by the graph height
+        """
+        if not on_start:
+            sj.save_key("history_window", window)
 
-    def hush_meter(self, in_data, frame_count, time_info, status):
-        assert self.detail_device is not None
-        db = get_db(in_data)
+        show = window > 0
+        if show:
+            self.history_graph.set_window(window)
+        if show == self.history_shown:
+            return
+
+        self.history_shown = show
+        extra = HISTORY_HEIGHT if show else 0
+        self.root.minsize(500, 225 + extra)
+        self.root.maxsize(1000, 250 + extra)
+        if show:
+            self.mf_2_5.pack(side="top", fill="x", expand=True, before=self.mf_2_4)
+        else:
+            self.mf_2_5.pack_forget()
+
+        if not on_start:  # the saved window size already includes the graph
+            w, h = self.root.winfo_width(), self.root.winfo_height()
+            self.root.geometry(f"{w}x{h + (HISTORY_HEIGHT if show else -HISTORY_HEIGHT)}")
+
+    def set_streaming_widgets(self, streaming: bool):
+        """
+        Lock the device options while streaming and start or stop the visualization
+        """
+        state = "disabled" if streaming else "readonly"
+        self.btn_toggle_start_hush["text"] = "Stop" if streaming else "Start"
+        self.cb_device["state"] = state
+        self.cb_hostAPI["state"] = state
+        self.cb_sample_rate["state"] = state
+        self.cb_channel["state"] = state
+
+        if streaming:
+            self.audio_meter.set_threshold(sj.cache["beep_when_reach"])
+            self.ui_channel.start()
+            if not sj.cache["no_visual"]:
+                self.with_visual()
+            else:
+                self.no_visual()
+        else:
+            self.lbl_vad_status["text"] = "VAD: Off" if sj.cache["vad_mode"] == "Off" else "VAD: On"
+            self.ui_channel.stop()
+            self.history_graph.stop()
+            self.audio_meter.set_db(self.min_v)
+            self.audio_meter.set_peak_hold(None)
+            self.audio_meter.meter_update()
+            self.audio_meter.stop()
+
+    def close_hush_meter(self, standby=False):
+        if self.built:
+            self.set_streaming_widgets(False)
+        self.engine.stop(standby)
+        if self.alert_latency.count:
+            logger.info(f"Capture to beep latency ({sj.cache['latency_profile']}): {self.alert_latency}")
+            self.alert_latency.reset()
+        if gc.tray:
+            gc.tray.reset_level()
+
+    def hush_meter(self, result: MeterResult):
+        """
+        Called by the engine worker for every chunk, only posts the values, the widgets are updated in `apply_ui_update`
+        """
+        self.history.add(result.db, monotonic())
+        db, peak_hold = result.db, None
+        ballistics = sj.cache["meter_ballistics"]
+        if result.levels and ballistics != "Off":
+            db, peak_hold = result.levels.get(ballistics, db), result.levels.peak_hold
+
+        self.ui_channel.post(db=db, peak_hold=peak_hold, is_speech=result.is_speech, alerting=result.alerting)
+        if gc.tray and sj.cache["tray_level"]:
+            gc.tray.set_level(db, result.alerting)
+
+    def apply_ui_update(self, changed: Dict):
+        """
+        Update the widgets whose value changed since the last drain of the ui channel, runs on the Tk thread
+        """
+        if "db" in changed or "peak_hold" in changed:
+            self.update_meter(self.ui_channel.applied["db"], self.ui_channel.applied["peak_hold"])
+
+        if "is_speech" in changed and changed["is_speech"] is not None:
+            if changed["is_speech"]:
+                self.lbl_vad_status["text"] = "VAD: On - Speaking"
+            else:
+                self.lbl_vad_status["text"] = "VAD: On - Not speaking"
+
+        if "alerting" in changed:
+            self.lbl_beep_status["text"] = "Beep!" if changed["alerting"] else ""
+
+        if "latency" in changed:
+            self.lbl_latency["text"] = f"Latency: {changed['latency']:.0f} ms"
+            self.tooltip_latency.text = f"Capture to beep latency, {self.alert_latency}"
+
+    def update_meter(self, db: float, peak_hold: Optional[float]):
         self.audio_meter.set_db(db)
+        self.audio_meter.set_peak_hold(peak_hold)
 
         if db > self.max_v:
             self.max_v = db
@@ -750,76 +1177,58 @@ class Hush:
         elif db < self.min_v:
             self.min_v = db
             self.audio_meter.min = db
+        self.audio_meter.request_update()
 
-        if sj.cache["vad_mode"] != "Off":
-            self.is_speech = self.vad.is_speech(in_data, self.detail_device["sample_rate"])
-            if self.is_speech:
-                self.lbl_vad_status["text"] = "VAD: On - Speaking"
-            else:
-                self.lbl_vad_status["text"] = "VAD: On - Not speaking"
-
-        if db < sj.cache["beep_when_reach"]:
-            self.lbl_beep_status["text"] = ""
-            return (in_data, pyaudio.paContinue)
-
-        if sj.cache["vad_mode"] == "Off":
-            self.lbl_beep_status["text"] = "Beep!"
-            self.play_sound()
-            return (in_data, pyaudio.paContinue)
+    def on_alert(self, result: MeterResult):
+        played_ns = self.play_sound()
+        if played_ns and result.captured_ns:
+            self.ui_channel.post(latency=self.alert_latency.add(result.captured_ns, played_ns))
 
-        if self.is_speech:
-            self.lbl_beep_status["text"] = "Beep!"
-            self.play_sound()
-
-        return (in_data, pyaudio.paContinue)
+    def on_stream_state(self, state: str):
+        """
+        Called by the stream supervisor, the meter stays on "Stop" while the streams are being reopened
+        """
+        if state == "lost":
+            if gc.tray:
+                gc.tray.reset_level()
+            nativeNotify("Mic lost", "The input device stopped delivering audio. Reconnecting...")
+        elif state == "restored":
+            nativeNotify("Mic reconnected", "Monitoring again")
 
     def call_hush_meter(self, start):
         try:
             # must be enable and not in auto mode
             if start:
                 # START
-                self.btn_toggle_start_hush["text"] = "Stop"
-                self.cb_device["state"] = "disabled"
-                self.cb_hostAPI["state"] = "disabled"
-                self.cb_sample_rate["state"] = "disabled"
-                self.cb_channel["state"] = "disabled"
-
                 self.max_v = MAX_THRESHOLD
                 self.min_v = MIN_THRESHOLD
-                self.p_rec = pyaudio.PyAudio()
-                self.audio_meter.set_threshold(sj.cache["beep_when_reach"])
-                logger.debug("getting device details")
-                success, detail = get_device_details(sj, self.p_rec)
-                if success:
-                    self.detail_device = detail
-                else:
-                    raise Exception("Failed to get mic device details")
-
                 self.init_mixer_with_check()
-                self.stream_rec = self.p_rec.open(
-                    format=pyaudio.paInt16,
-                    channels=get_channel_int(self.detail_device["num_of_channels"]),
-                    rate=self.detail_device["sample_rate"],
-                    input=True,
-                    frames_per_buffer=self.detail_device["chunk_size"],
-                    input_device_index=self.detail_device["device_detail"]["index"],  # type: ignore
-                    stream_callback=self.hush_meter,
-                )
-
-                if not sj.cache["no_visual"]:
-                    self.with_visual()
+                self.engine.open()
+                if not self.built:
+                    log_startup("monitoring started")
                 else:
-                    self.no_visual()
-
-                self.streaming = True
+                    self.set_streaming_widgets(True)
             else:
-                self.close_hush_meter()
+                self.close_hush_meter(sj.cache["standby"])
         except Exception as e:
             logger.exception(e)
             # fail because probably no device
             self.close_hush_meter()
             nativeNotify("Error", "Failed to start mic meter. Check log for more details")
 
+    def standby_change(self):
+        sj.save_key("standby", self.var_standby.get())
+        if not self.var_standby.get():
+            self.close_standby()
+
+    def close_standby(self):
+        """
+        Close the streams kept open in standby, if any
+        """
+        if self.engine.paused:
+            self.engine.close()
+            logger.debug("Standby streams closed")
+
     def start_hush(self):
         t_meter = Thread(target=self.call_hush_meter, daemon=True, args=[self.btn_toggle_start_hush["text"] == "Start"])
         t_meter.start()
@@ -843,6 +1252,8 @@ class Hush:
 
     def req_update_check(self):
         try:
+            from requests import get  # only needed here, not worth loading on startup
+
             # request to github api, compare version. If not same tell user to update
             req = get("https://api.github.com/repos/Dadangdut33/Hush/releases/latest")
 
@@ -881,9 +1292,14 @@ class Hush:
             self.checking = False
 
 
-def main():
+def main(tray_first=False):
+    """
+    Start the tray and the main window, with `tray_first` (or the start_in_tray setting) the window stays hidden and
+    monitoring starts right away
+    """
     logger.info(f"Starting {APP_NAME} {__version__}")
 
     tray = AppTray()  # noqa
-    main = Hush()
+    log_startup("tray created")
+    main = Hush(tray_first or sj.cache["start_in_tray"])
     main.root.mainloop()
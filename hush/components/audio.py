@@ -1,7 +1,16 @@
+from time import perf_counter
 from tkinter import Canvas
 
 
 class AudioMeter(Canvas):
+    """
+    Horizontal loudness meter. The bar and the ruler are created once, every update only moves the bar with `coords`.
+    The ruler is rebuilt when the scale, threshold or canvas size changes. An optional peak hold marker is drawn as a
+    line over the bar. A redraw is skipped when neither would move by a pixel (a few pixels in performance mode).
+
+    Redraws are driven by the data: `request_update` schedules one redraw after new levels arrive, at most `max_fps`
+    times per second, and nothing is scheduled while the meter is stopped or hidden.
+    """
     def __init__(
         self,
         master,
@@ -12,6 +21,7 @@ class AudioMeter(Canvas):
         max: float,
         auto_resize=False,
         performance_mode=True,
+        max_fps=30,
         **kwargs
     ):
         super().__init__(master, **kwargs)
@@ -21,21 +31,33 @@ class AudioMeter(Canvas):
         self.max = max
         self.show_threshold = show_threshold
         self.db = min
-        self.prev_db = -60
+        self.peak_hold = None
         self.threshold = threshold
         self.running = False
         self.recording = False
         self.after_id = None
         self.performance_mode = performance_mode
+        self.max_fps = max_fps
+        self.visible = True
+        self.last_draw = 0.0
+        self.bar = self.create_rectangle(0, 0, 0, 0, fill="green", tags="loudness_bar")
+        self.hold_line = self.create_line(0, 0, 0, 0, fill="dark green", width=2, state="hidden", tags="peak_hold")
+        self.ruler_key = None  # (min, max, threshold, show_threshold, width, height) the ruler was drawn with
+        self.drawn = None  # (bar_width, hold_x) of the last redraw
 
         self.meter_update()
         if auto_resize:
             self.root.bind("<Configure>", self.resize_x_canvas)
 
     def set_db(self, db):
-        self.prev_db = self.db
         self.db = db
 
+    def set_peak_hold(self, peak_hold):
+        """
+        db of the peak hold marker, None to hide it
+        """
+        self.peak_hold = peak_hold
+
     def set_max(self, max):
         self.max = max
 
@@ -51,40 +73,92 @@ class AudioMeter(Canvas):
     def set_performance_mode(self, performance_mode):
         self.performance_mode = performance_mode
 
+    def set_max_fps(self, max_fps):
+        self.max_fps = max_fps
+
+    def set_visible(self, visible):
+        """
+        Suspend the redraws while the window is withdrawn or minimized, catch up with the latest level when shown again
+        """
+        self.visible = visible
+        if visible:
+            self.request_update()
+        else:
+            self.cancel_update()
+
     def start(self):
         self.running = True
-        self.update_visual()
+        self.request_update()
 
     def stop(self):
+        self.cancel_update()
+        self.running = False
+
+    def cancel_update(self):
         if self.after_id:
             self.root.after_cancel(self.after_id)
-        self.running = False
+            self.after_id = None
 
-    def update_visual(self):
-        self.meter_update()
+    def request_update(self):
+        """
+        Schedule a redraw with the latest level. Levels arriving before it runs are coalesced into that single redraw.
+        """
+        if not self.running or not self.visible or self.after_id:
+            return
 
-        if self.running:
-            self.after_id = self.root.after(10, self.update_visual)
+        wait = 1 / self.max_fps - (perf_counter() - self.last_draw)
+        self.after_id = self.root.after(max(0, int(wait * 1000)), self.update_visual)
 
-    def meter_update(self):
-        # if performance mode, check wether db is still near prev_db
-        if self.performance_mode and abs(self.db - self.prev_db) <= 3:
-            return
+    def update_visual(self):
+        self.after_id = None
+        self.last_draw = perf_counter()
+        self.meter_update()
 
+    def to_x(self, db):
         # Map loudness to the canvas width
-        loudness_percentage = (self.db - self.min) / (self.max - self.min)
-        bar_width = int(self.winfo_width() * loudness_percentage)
+        return int(self.winfo_width() * (db - self.min) / (self.max - self.min))
 
-        # Update the loudness bar
+    def meter_update(self):
+        # a rebuilt ruler means the scale changed, so everything moves even if the levels did not
+        rebuilt = self.ruler_update()
+        bar_width = self.to_x(self.db)
+        hold_x = None if self.peak_hold is None else min(max(self.to_x(self.peak_hold), 0), self.winfo_width() - 1)
+
+        if not rebuilt and self.drawn is not None:
+            tolerance = 2 if self.performance_mode else 0
+            prev_bar, prev_hold = self.drawn
+            hold_same = hold_x == prev_hold or (
+                hold_x is not None and prev_hold is not None and abs(hold_x - prev_hold) <= tolerance
+            )
+            if abs(bar_width - prev_bar) <= tolerance and hold_same:
+                return
+
+        self.drawn = (bar_width, hold_x)
         self.bar_update(bar_width)
+        self.hold_update(hold_x)
 
     def bar_update(self, bar_width):
-        # Clear canvas and draw the loudness bar
-        self.delete("all")
-        self.create_rectangle(0, 0, bar_width, self.winfo_height(), fill="green", tags="loudness_bar")
+        # Move the existing bar, the ruler is only redrawn if something it depends on changed
+        self.coords(self.bar, 0, 0, bar_width, self.winfo_height())
         self.ruler_update()
 
+    def hold_update(self, hold_x):
+        if hold_x is None:
+            self.itemconfigure(self.hold_line, state="hidden")
+        else:
+            self.coords(self.hold_line, hold_x, 0, hold_x, self.winfo_height())
+            self.itemconfigure(self.hold_line, state="normal")
+
     def ruler_update(self):
+        """
+        Rebuild the ruler if the scale, threshold or size changed since it was drawn, return wether it was rebuilt
+        """
+        key = (self.min, self.max, self.threshold, self.show_threshold, self.winfo_width(), self.winfo_height())
+        if key == self.ruler_key:
+            return False
+
+        self.ruler_key = key
+        self.delete("ruler")
         # Draw dB level markers. For every 5 db make long line and text, other than that make little line
         for db_level in range(int(self.min), int(self.max + 1)):
             marker_x = (db_level - self.min) / (self.max - self.min) * self.winfo_width()
@@ -100,6 +174,8 @@ class AudioMeter(Canvas):
             else:
                 self.create_line(marker_x, 0, marker_x, self.winfo_height() / 5, fill="black", tags="ruler")
 
+        return True
+
     def resize_x_canvas(self, event):
         self.config(width=event.width)
         self.meter_update()
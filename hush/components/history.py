@@ -0,0 +1,105 @@
+from tkinter import Canvas
+
+import numpy as np
+
+from ..utils.audio.history import LevelHistory
+
+
+class HistoryGraph(Canvas):
+    """
+    Scrolling loudness history of the last `window` seconds with the beep threshold overlaid.
+
+    The min / max envelope is a single polygon whose coordinates are replaced on every redraw, so the number of canvas
+    items never changes. The graph redraws itself every `interval_ms` while running and visible, and only when the
+    history received new values.
+    """
+    def __init__(
+        self,
+        master,
+        root,
+        history: LevelHistory,
+        window: int,
+        threshold: float,
+        min: float,
+        max: float,
+        interval_ms=250,
+        **kwargs
+    ):
+        super().__init__(master, **kwargs)
+
+        self.root = root
+        self.history = history
+        self.window = window
+        self.threshold = threshold
+        self.min = min
+        self.max = max
+        self.interval_ms = interval_ms
+        self.running = False
+        self.visible = True
+        self.after_id = None
+        self.drawn = None  # (history version, window, threshold, width, height) of the last redraw
+
+        self.envelope = self.create_polygon(0, 0, 0, 0, fill="#7fbf7f", outline="green", tags="envelope")
+        self.threshold_line = self.create_line(0, 0, 0, 0, fill="red", dash=(4, 2), tags="threshold")
+        self.label = self.create_text(3, 2, anchor="nw", fill="black", tags="label")
+        self.bind("<Configure>", lambda _: self.graph_update())
+
+    def set_window(self, window):
+        self.window = window
+        self.graph_update()
+
+    def set_threshold(self, threshold):
+        self.threshold = threshold
+        self.graph_update()
+
+    def set_visible(self, visible):
+        self.visible = visible
+        if visible:
+            self.schedule()
+        else:
+            self.cancel()
+
+    def start(self):
+        self.running = True
+        self.schedule()
+
+    def stop(self):
+        self.cancel()
+        self.running = False
+
+    def schedule(self):
+        if self.running and self.visible and not self.after_id:
+            self.after_id = self.root.after(self.interval_ms, self.tick)
+
+    def cancel(self):
+        if self.after_id:
+            self.root.after_cancel(self.after_id)
+            self.after_id = None
+
+    def tick(self):
+        self.after_id = None
+        self.graph_update()
+        self.schedule()
+
+    def to_y(self, db, height):
+        return height - (np.clip(db, self.min, self.max) - self.min) / (self.max - self.min) * height
+
+    def graph_update(self):
+        width, height = self.winfo_width(), self.winfo_height()
+        key = (self.history.version, self.window, self.threshold, width, height)
+        if key == self.drawn or width <= 1:
+            return
+        self.drawn = key
+
+        mins, maxs = self.history.get(self.window)
+        # no audio is drawn as a flat line at the bottom
+        top = self.to_y(np.nan_to_num(maxs, nan=self.min), height)
+        bottom = self.to_y(np.nan_to_num(mins, nan=self.min), height)
+        x = np.linspace(0, width, len(top))
+        points = np.concatenate([np.column_stack([x, top]), np.column_stack([x[::-1], bottom[::-1]])])
+        self.coords(self.envelope, *points.ravel().tolist())
+
+        y = float(self.to_y(self.threshold, height))
+        self.coords(self.threshold_line, 0, y, width, y)
+        minutes = self.window // 60
+        self.itemconfigure(self.label, text=f"last {minutes} minute{'s' if minutes > 1 else ''}")
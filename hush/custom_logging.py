@@ -76,7 +76,8 @@ def init_logging():
 
     # Create handlers
     c_handler = logging.StreamHandler()
-    f_handler = logging.FileHandler(dir_log + "/" + current_log, encoding="utf-8", mode="w")
+    # append, the worker processes of the analyze command may share the file
+    f_handler = logging.FileHandler(dir_log + "/" + current_log, encoding="utf-8", mode="a")
     c_handler.setLevel(logging.DEBUG)
     f_handler.setLevel(logging.DEBUG)
 
@@ -0,0 +1,603 @@
+from threading import Event, Lock, Thread, current_thread
+from time import perf_counter_ns
+from typing import Callable, List, NamedTuple, Optional, Tuple
+
+from .utils.audio.alert import AlertScheduler, aggregate
+from .utils.audio.ballistics import MeterBallistics, MeterLevels
+from .utils.audio.device import get_channel_int, get_db, get_db_batch, get_device_details
+from .utils.audio.framing import FrameAdapter
+from .utils.audio.latency import get_profile
+from .utils.audio.registry import registry
+from .utils.audio.ringbuffer import CallbackStats, RingBuffer
+from .utils.audio.session import session
+from .utils.audio.source import INPUT_OVERFLOW, AudioSource, PullAudioSource, PyAudioSource
+from .utils.startup import log_startup
+from .utils.audio.weighting import WeightingFilter
+from .custom_logging import logger
+
+STALL_SECONDS = 2.0  # a stream without any chunk for that long is considered dead
+SUPERVISOR_INTERVAL = 0.5  # seconds between two health checks of the streams
+BACKOFF_MIN = 0.5  # seconds before the second reopen attempt, doubled after every failure
+BACKOFF_MAX = 30.0
+FALLBACK_AFTER = 3  # failed attempts on the lost devices before the fallback device is tried too
+STANDBY_KEYS = ("device", "extra_devices", "sample_rate", "channel", "latency_profile", "capture_mode")
+
+
+class MeterResult(NamedTuple):
+    db: float
+    is_speech: Optional[bool]  # None when VAD is off
+    alerting: bool  # level is over the threshold long enough, released with hysteresis
+    beep: bool  # a beep should be played for this chunk
+    levels: Optional[MeterLevels] = None  # meter ballistics of the loudest device, when enabled in the engine
+    captured_ns: int = 0  # perf_counter_ns estimate of when the chunk was captured, 0 when unknown
+
+
+class DeviceMonitor:
+    """
+    Analysis pipeline of a single input device: db (optionally weighted) and VAD of every chunk.
+
+    When started on an `AudioSource`, the chunk callback only copies the chunk into a preallocated ring buffer and a
+    worker thread does the analysis, then hands the result to the engine.
+    """
+    def __init__(self, engine: "HushEngine", sample_rate: int, channels: int, name: str = ""):
+        self.engine = engine
+        self.sj = engine.sj
+        self.name = name
+        self.sample_rate = sample_rate
+        self.channels = channels
+        self.vad = None  # webrtcvad is only imported once the VAD is turned on
+        self.weighting_filter: Optional[WeightingFilter] = None
+        self.frame_adapter: Optional[FrameAdapter] = None  # created when the VAD is first needed
+        self.last_speech = False  # VAD decision of the last complete frame
+        self.audio_time = 0.0  # seconds of audio processed since the stream was opened
+        self.db = 0.0
+        self.is_speech: Optional[bool] = None
+        self.ballistics = MeterBallistics(sample_rate, channels) if engine.ballistics else None
+        self.levels: Optional[MeterLevels] = None
+        self.source: Optional[AudioSource] = None
+        self.ring: Optional[RingBuffer] = None
+        self.worker: Optional[Thread] = None
+        self.callback_stats = CallbackStats()
+        self.vad_frame_ms = get_profile(self.sj.cache["latency_profile"]).vad_frame_ms
+        self.capture_ns = 0  # capture time of the chunk being analyzed
+        self.last_chunk_ns = 0  # heartbeat of the stream callback, checked by the supervisor
+
+    def get_db(self, in_data: bytes) -> float:
+        """
+        Unweighted or weighted db of the chunk, depending on the current setting. The filter keeps its state between
+        chunks and is only rebuilt when the weighting changes.
+        """
+        weighting = self.sj.cache["weighting"]
+        if weighting == "Off":
+            self.weighting_filter = None
+            return get_db(in_data)
+
+        if self.weighting_filter is None or self.weighting_filter.weighting != weighting:
+            self.weighting_filter = WeightingFilter(weighting, self.sample_rate, self.channels)
+
+        return self.weighting_filter.get_db(in_data)
+
+    def get_speech(self, in_data: bytes) -> bool:
+        """
+        Run the VAD on every complete mono frame the chunk produced. When the chunk is shorter than a VAD frame,
+        the decision of the last complete frame is kept.
+        """
+        if self.vad is None:
+            from webrtcvad import Vad
+
+            self.vad = Vad(int(self.sj.cache["vad_mode"]))
+        if self.frame_adapter is None:
+            self.frame_adapter = FrameAdapter(self.sample_rate, self.channels, self.vad_frame_ms)
+        frames = self.frame_adapter.push(in_data)
+        if frames:
+            self.last_speech = any(self.vad.is_speech(frame, self.sample_rate) for frame in frames)
+
+        return self.last_speech
+
+    def analyze(self, in_data: bytes):
+        """
+        Update `db`, `is_speech`, `levels` and `audio_time` from a chunk of int16 audio data
+        """
+        self.db = self.get_db(in_data)
+        if self.ballistics:
+            self.levels = self.ballistics.process(in_data)
+        self.is_speech = self.get_speech(in_data) if self.sj.cache["vad_mode"] != "Off" else None
+        self.audio_time += len(in_data) / (2 * self.channels * self.sample_rate)  # int16
+
+    def analyze_block(self, block: bytes, chunk_size: int) -> List[Tuple[float, float]]:
+        """
+        Analyze a block of several chunks read at once. Unweighted levels of all the chunks are computed in one
+        vectorized step, the VAD and the ballistics run once over the whole block. Returns the (db, audio time) of
+        every chunk, `db` is left at the last one
+        """
+        chunk_bytes = chunk_size * self.channels * 2  # int16
+        n = len(block) // chunk_bytes
+        if self.sj.cache["weighting"] == "Off" and n * chunk_bytes == len(block):
+            self.weighting_filter = None
+            dbs = get_db_batch(block, chunk_size * self.channels).tolist()
+        else:  # the weighting filter is built per chunk length, a block sized filter matrix would be huge
+            dbs = [self.get_db(block[i:i + chunk_bytes]) for i in range(0, len(block), chunk_bytes)]
+
+        if self.ballistics:
+            self.levels = self.ballistics.process(block)
+        self.is_speech = self.get_speech(block) if self.sj.cache["vad_mode"] != "Off" else None
+
+        steps = []
+        for i, db in enumerate(dbs):
+            self.audio_time += min(chunk_bytes, len(block) - i * chunk_bytes) / (2 * self.channels * self.sample_rate)
+            steps.append((db, self.audio_time))
+        self.db = dbs[-1] if dbs else self.db
+        return steps
+
+    def on_chunk(self, in_data: bytes, status: int):
+        start = perf_counter_ns()
+        self.last_chunk_ns = start
+        self.ring.write(in_data)  # type: ignore
+        self.callback_stats.add(start, status, INPUT_OVERFLOW)
+
+    def chunk_capture_ns(self) -> int:
+        """
+        When the first sample of the chunk just read reached the ADC: the time of the last callback minus the PortAudio
+        input latency, minus the chunks still waiting in the ring
+        """
+        assert self.source is not None and self.ring is not None
+        chunk_ns = self.source.block_size * 1_000_000_000 // self.sample_rate
+        return self.last_chunk_ns - int(self.source.input_latency * 1e9) - self.ring.pending() * chunk_ns
+
+    def consume(self):
+        """
+        Worker loop, analyze the chunks written by the stream callback until the engine stops streaming
+        """
+        assert self.ring is not None and self.source is not None
+        chunk_bytes = self.source.chunk_size * self.channels * 2  # int16
+        while self.engine.streaming:
+            data = self.ring.read(timeout=0.1)
+            if data is None:
+                continue
+            self.capture_ns = self.chunk_capture_ns()
+            if not self.engine.first_chunk_logged:
+                self.engine.first_chunk_logged = True
+                log_startup("first audio chunk")
+            try:
+                if len(data) > chunk_bytes:
+                    self.engine.process_block(data, self)
+                else:
+                    self.engine.process(data, self)
+            except Exception as e:
+                logger.exception(e)
+
+    def start(self, source: AudioSource):
+        self.source = source
+        self.start_worker()
+        source.start(self.on_chunk)
+
+    def start_worker(self):
+        assert self.source is not None
+        self.ring = RingBuffer(self.source.block_size * self.channels * 2)  # int16
+        self.worker = Thread(target=self.consume, daemon=True, name=f"HushEngine-worker-{self.name}")
+        self.worker.start()
+        self.last_chunk_ns = perf_counter_ns()  # the first chunk gets the same grace period as any other
+
+    def pause(self):
+        """
+        Stop the source and the worker but keep the source open, chunks still in the ring are dropped
+        """
+        if self.source:
+            self.source.pause()
+        if self.worker:
+            self.worker.join(timeout=1)  # exits on its own once the engine stops streaming
+            self.worker = None
+
+    def resume(self):
+        assert self.source is not None
+        self.start_worker()
+        self.source.resume()
+
+    def close(self):
+        if self.source:
+            self.source.stop()
+        if self.worker:
+            self.worker.join(timeout=1)
+            self.worker = None
+        if self.ring:
+            logger.debug(f"Stream {self.name}: {self.callback_stats} | ring overruns {self.ring.overruns}")
+
+
+class HushEngine:
+    """
+    Loudness detection engine, independent of any UI.
+
+    Owns the input streams, the db computation, VAD gating, the threshold check and the alert dispatch.
+    Results are exposed through the `on_result` (every chunk) and `on_alert` (only when it should beep) callbacks.
+    When to beep is decided by an `AlertScheduler` driven by the audio clock. With `ballistics`, the VU, PPM and
+    peak hold levels for the meter are also computed here, on the worker thread, so the UI only has to draw them.
+    Settings are read live from the setting object so changes apply without restarting the stream.
+
+    The selected device and every device in `extra_devices` are opened on one shared PyAudio instance, each with its own
+    `DeviceMonitor`. Their latest levels are combined with the `aggregation` policy into one alert scheduler, so there
+    is still a single beep no matter how many devices are monitored. Any other `AudioSource` (a recording, a synthetic
+    signal) can be monitored the same way with `open_sources`.
+    """
+    def __init__(
+        self,
+        sj,
+        on_result: Optional[Callable[[MeterResult], None]] = None,
+        on_alert: Optional[Callable[[MeterResult], None]] = None,
+        ballistics: bool = False,
+        on_stream_state: Optional[Callable[[str], None]] = None,
+    ):
+        self.sj = sj
+        self.ballistics = ballistics
+        self.on_result = on_result
+        self.on_alert = on_alert
+        self.on_stream_state = on_stream_state
+        self.supervisor: Optional[StreamSupervisor] = None
+        self.alert = AlertScheduler(sj.cache["beep_when_reach"])
+        self.monitors: List[DeviceMonitor] = []
+        self.lock = Lock()  # the workers of every device share the alert scheduler
+        self.p_rec = None
+        self.audio_time = 0.0  # engine wide audio clock for the shared alert scheduler, see `dispatch`
+        self.streaming = False
+        self.paused = False  # stopped in standby, the streams are still open
+        self.standby_key: Optional[tuple] = None  # setting the paused streams were opened with
+        self.first_chunk_logged = False  # time to the first chunk is logged once per process
+
+    def set_vad_mode(self, mode: str):
+        if mode != "Off":
+            for monitor in self.monitors:
+                if monitor.vad:
+                    monitor.vad.set_mode(int(mode))
+
+    def add_monitor(self, sample_rate: int, channels: int, name: str = "") -> DeviceMonitor:
+        monitor = DeviceMonitor(self, sample_rate, channels, name)
+        self.monitors.append(monitor)
+        return monitor
+
+    def process(self, in_data: bytes, monitor: Optional[DeviceMonitor] = None) -> MeterResult:
+        """
+        Analyze a single chunk of audio from one of the monitored devices and dispatch the callbacks
+
+        Parameters
+        ----------
+        in_data : bytes
+            chunk of int16 audio data
+        monitor : DeviceMonitor, optional
+            device the chunk comes from, defaults to the first one
+
+        Returns
+        -------
+        MeterResult
+            aggregated db value, speech flag, alert state, and wether it should beep
+        """
+        if monitor is None:
+            monitor = self.monitors[0]
+        monitor.analyze(in_data)
+        return self.dispatch(monitor, [(monitor.db, monitor.audio_time)])
+
+    def process_block(self, block: bytes, monitor: DeviceMonitor) -> MeterResult:
+        """
+        Analyze a block of several chunks read at once (pull capture). Every chunk still goes through the alert
+        scheduler on the audio clock, so the alert timing does not depend on the block size, but the callbacks are
+        only called once per block, with the loudest chunk of the block
+        """
+        assert monitor.source is not None
+        return self.dispatch(monitor, monitor.analyze_block(block, monitor.source.chunk_size))
+
+    def dispatch(self, monitor: DeviceMonitor, steps: List[Tuple[float, float]]) -> MeterResult:
+        """
+        Feed the (db, audio time) of the analyzed chunks of a monitor to the alert scheduler and call the callbacks.
+
+        Every monitor counts the audio time of its own device from 0, so the shared scheduler runs on the furthest time
+        any of them reached. The clock never goes back when the devices deliver their chunks in turns, and with a
+        single device it is that device's audio time.
+        """
+        with self.lock:
+            policy = self.sj.cache["aggregation"]
+            speech = [m.is_speech for m in self.monitors if m.is_speech is not None]
+            is_speech = any(speech) if speech else None
+
+            self.alert.apply_setting(self.sj.cache)
+            db, beep = float("-inf"), False
+            for step_db, audio_time in steps:
+                monitor.db = step_db
+                self.audio_time = max(self.audio_time, audio_time)
+                step_db, gate = aggregate([(m.db, m.is_speech) for m in self.monitors], policy)
+                beep = self.alert.update(step_db, self.audio_time, gate=gate) or beep
+                db = max(db, step_db)
+            levels = None
+            if self.ballistics:
+                levels = MeterLevels(*(max(values) for values in zip(*(m.levels for m in self.monitors if m.levels))))
+            result = MeterResult(db, is_speech, self.alert.active, beep, levels, monitor.capture_ns)
+
+        if self.on_result:
+            self.on_result(result)
+        if beep and self.on_alert:
+            self.on_alert(result)
+
+        return result
+
+    def open(self):
+        """
+        Open the input streams based on the current setting. Raise an exception if it fails. With `auto_reconnect`,
+        a `StreamSupervisor` reopens them whenever they die until `close` is called.
+
+        Streams paused by `stop(standby=True)` are only restarted when the setting they were opened with did not
+        change, otherwise they are closed and opened again.
+        """
+        start = perf_counter_ns()
+        if self.paused and self.standby_key == self.standby_config():
+            how = "resumed from standby" if self.resume() else "reopened, standby failed to resume"
+        else:
+            if self.paused:
+                logger.debug("Standby streams are outdated, reopening")
+                self.close()
+            self.open_devices()
+            how = "opened"
+        if self.sj.cache["auto_reconnect"]:
+            self.supervisor = StreamSupervisor(self, self.on_stream_state)
+            self.supervisor.start()
+        logger.info(f"Start: {len(self.monitors)} stream(s) {how} in {(perf_counter_ns() - start) / 1e6:.1f} ms")
+
+    def stop(self, standby: bool = False):
+        """
+        Stop monitoring. With `standby` the streams are only paused, they stay open and configured so the next `open`
+        is a quick restart. A paused stream does not capture, the device is released by `close`.
+        """
+        start = perf_counter_ns()
+        on_fallback = self.supervisor is not None and self.supervisor.on_fallback  # start on the saved devices again
+        if standby and self.monitors and not self.paused and not on_fallback:
+            self.pause()
+            how = "paused for standby"
+        else:
+            self.close()
+            how = "closed"
+        logger.info(f"Stop: stream(s) {how} in {(perf_counter_ns() - start) / 1e6:.1f} ms")
+
+    def standby_config(self) -> tuple:
+        """
+        Setting values the streams are opened with, paused streams are reused only while these stay the same
+        """
+        return tuple(str(self.sj.cache[key]) for key in STANDBY_KEYS)
+
+    def pause(self):
+        if self.supervisor:
+            self.supervisor.stop()
+            self.supervisor = None
+        self.standby_key = self.standby_config()
+        self.streaming = False
+        for monitor in self.monitors:
+            monitor.pause()
+        self.paused = True
+
+    def resume(self) -> bool:
+        """
+        Restart the paused streams. If one can not be restarted, e.g. its device was removed while paused, every stream
+        is closed and opened again the normal way. Returns False in that case
+        """
+        self.alert.reset()
+        self.streaming = True
+        self.paused = False
+        for monitor in self.monitors:
+            try:
+                monitor.resume()
+            except Exception as e:
+                logger.warning(f"Failed to resume {monitor.name} from standby ({e}), reopening the input streams")
+                self.close_streams()
+                self.open_devices()
+                return False
+        return True
+
+    def open_devices(self, devices: Optional[List[str]] = None):
+        """
+        Open the input streams of `devices`, defaults to the selected device and the extra devices
+        """
+        try:
+            self.open_sources(self.get_sources(devices))
+        except Exception as e:
+            # PortAudio only sees devices that existed when it was initialized, rescan and try once more
+            logger.warning(f"Failed to open the input streams ({e}), rescanning the devices and retrying once")
+            self.close_streams()
+            session.refresh()
+            self.open_sources(self.get_sources(devices))
+
+    def get_sources(self, devices: Optional[List[str]] = None) -> List[AudioSource]:
+        """
+        Input streams of the given devices, on the shared audio session
+        """
+        self.p_rec = session.acquire()
+        registry.resolve_saved(self.sj)  # follow the devices if PortAudio renumbered them
+
+        if devices is None:
+            devices = [self.sj.cache["device"]]
+            devices += [d for d in self.sj.cache["extra_devices"] if d not in devices]
+        sources = []
+        for device in devices:
+            logger.debug(f"getting device details of {device}")
+            success, detail = get_device_details(self.sj, device)
+            if not success:
+                raise Exception(f"Failed to get mic device details of {device}")
+            args = (
+                self.p_rec,
+                detail["device"].index,
+                detail["sample_rate"],
+                get_channel_int(detail["num_of_channels"]),
+                detail["chunk_size"],
+            )
+            if self.sj.cache["capture_mode"] == "pull":
+                batch = get_profile(self.sj.cache["latency_profile"]).pull_batch()
+                sources.append(PullAudioSource(*args, batch=batch, name=detail["device"].name))
+            else:
+                sources.append(PyAudioSource(*args, name=detail["device"].name))
+
+        return sources
+
+    def open_sources(self, sources: List[AudioSource]):
+        """
+        Start monitoring the given audio sources, each one gets its own `DeviceMonitor`
+        """
+        self.monitors = []
+        self.alert.reset()
+        self.audio_time = 0.0
+        self.streaming = True
+        for source in sources:
+            self.add_monitor(source.sample_rate, source.channels, source.name).start(source)
+
+        if len(self.monitors) > 1:
+            logger.info(f"Monitoring {len(self.monitors)} devices, aggregation: {self.sj.cache['aggregation']}")
+
+    def close(self):
+        if self.supervisor:
+            self.supervisor.stop()
+            self.supervisor = None
+        self.close_streams()
+        self.paused = False
+
+    def close_streams(self):
+        self.streaming = False
+        for monitor in self.monitors:
+            monitor.close()
+
+        if self.p_rec:  # the session stays initialized, it is shared with the device lists
+            session.release()
+            self.p_rec = None
+
+
+class StreamSupervisor:
+    """
+    Watches the input streams of an engine and reopens them when they die or stall.
+
+    A stream is dead when PortAudio stopped it (device unplugged, default device switched) and stalled when its
+    callback did not deliver any chunk for `stall_seconds`. All the streams are then closed, the cached device list is
+    rescanned so devices that were renumbered or plugged back are found, and the same devices are reopened. After
+    `FALLBACK_AFTER` failed attempts, the fallback device (or the system default) is tried every other attempt.
+    Attempts are spaced with an exponential backoff and go on until the engine is closed. The length of the gap
+    without audio is logged once every stream delivers again.
+
+    Once on the fallback device the supervisor stays there until the engine is opened again (Stop / Start). PortAudio
+    only sees a device that came back after a rescan, which needs every stream closed, so checking for it would cut
+    the audio of the working fallback.
+
+    `on_state` is called with "lost" when the streams are lost and "restored" when audio is back, on the supervisor
+    thread.
+    """
+    def __init__(
+        self,
+        engine: HushEngine,
+        on_state: Optional[Callable[[str], None]] = None,
+        stall_seconds: float = STALL_SECONDS,
+        interval: float = SUPERVISOR_INTERVAL,
+    ):
+        self.engine = engine
+        self.on_state = on_state
+        self.stall_ns = int(stall_seconds * 1e9)
+        self.interval = interval
+        self.stop_event = Event()
+        self.lock = Lock()  # `stop` waits for a reopen in progress, so no stream is opened after the engine is closed
+        self.thread: Optional[Thread] = None
+        self.gap_start_ns: Optional[int] = None  # last chunk before the streams were lost, None while healthy
+        self.reopened_ns = 0
+        self.attempts = 0  # reopen attempts since the streams were lost
+        self.delay = BACKOFF_MIN
+        self.overflows = 0
+        self.reconnects = 0
+        self.on_fallback = False  # the fallback device replaced the lost ones
+
+    def start(self):
+        self.stop_event.clear()
+        self.thread = Thread(target=self.run, daemon=True, name="HushEngine-supervisor")
+        self.thread.start()
+
+    def stop(self):
+        with self.lock:
+            self.stop_event.set()
+        if self.thread and self.thread is not current_thread():
+            self.thread.join(timeout=5)  # opening a stream can block for a while on some host APIs
+            self.thread = None
+
+    def set_state(self, state: str):
+        if self.on_state:
+            try:
+                self.on_state(state)
+            except Exception as e:
+                logger.exception(e)
+
+    def run(self):
+        while not self.stop_event.wait(self.interval):
+            reason = self.check()
+            if reason:
+                self.recover(reason)
+
+    def check(self) -> str:
+        """
+        Why the streams must be reopened, empty if they are all alive
+        """
+        monitors = self.engine.monitors
+        now = perf_counter_ns()
+        overflows = 0
+        for monitor in monitors:
+            overflows += monitor.callback_stats.input_overflows
+            if monitor.source and not monitor.source.alive():
+                return f"stream of {monitor.name} stopped"
+            if now - monitor.last_chunk_ns > self.stall_ns:
+                return f"no audio from {monitor.name} for {(now - monitor.last_chunk_ns) / 1e9:.1f} s"
+
+        if overflows > self.overflows:
+            logger.debug(f"{overflows - self.overflows} input overflow(s) in the last {self.interval} s")
+        self.overflows = overflows
+
+        if self.gap_start_ns is not None and monitors and all(m.last_chunk_ns > self.reopened_ns for m in monitors):
+            gap = (min(m.last_chunk_ns for m in monitors) - self.gap_start_ns) / 1e9
+            logger.info(f"Audio is back after a gap of {gap:.1f} s ({self.attempts} reopen attempt(s))")
+            self.gap_start_ns = None
+            self.attempts = 0
+            self.delay = BACKOFF_MIN
+            self.set_state("restored")
+
+        return ""
+
+    def fallback_devices(self) -> Optional[List[str]]:
+        fallback = self.engine.sj.cache["fallback_device"]
+        if not fallback:
+            record = registry.default_record()
+            fallback = record.label if record else ""
+        if not fallback or fallback == self.engine.sj.cache["device"]:
+            return None
+        return [fallback]
+
+    def recover(self, reason: str):
+        if self.gap_start_ns is None:
+            logger.warning(f"Input lost: {reason}. Reopening")
+            self.gap_start_ns = max((m.last_chunk_ns for m in self.engine.monitors), default=perf_counter_ns())
+            self.set_state("lost")
+        else:
+            logger.warning(f"Input lost again right after reopening: {reason}")
+            if self.stop_event.wait(self.delay):
+                return
+            self.delay = min(self.delay * 2, BACKOFF_MAX)
+
+        while not self.stop_event.is_set():
+            self.attempts += 1
+            devices = None
+            if self.attempts > FALLBACK_AFTER and self.attempts % 2 == 0:
+                devices = self.fallback_devices()
+            try:
+                self.engine.close_streams()
+                session.refresh()
+                sources = self.engine.get_sources(devices)
+                with self.lock:
+                    if self.stop_event.is_set():  # the engine was closed meanwhile
+                        self.engine.close_streams()
+                        return
+                    self.engine.open_sources(sources)
+                self.on_fallback = devices is not None
+                self.reopened_ns = perf_counter_ns()
+                self.overflows = 0
+                self.reconnects += 1
+                logger.info(f"Reopened {devices[0] + ' (fallback)' if devices else 'the input'}, attempt {self.attempts}")
+                return
+            except Exception as e:
+                self.engine.close_streams()
+                logger.warning(f"Reopen attempt {self.attempts} failed ({e}), next one in {self.delay:.1f} s")
+                if self.stop_event.wait(self.delay):
+                    return
+                self.delay = min(self.delay * 2, BACKOFF_MAX)
@@ -0,0 +1,72 @@
+from signal import SIGINT, signal
+from time import sleep
+from typing import Optional
+
+from .engine import HushEngine, MeterResult
+from .utils.audio.beep import Beeper
+from .utils.audio.latency import AlertLatency
+from .utils.audio.session import session
+from .utils.audio.source import SyntheticSource
+from .analyze import open_recording
+from ._version import __version__
+from .globals import gc, sj
+from .custom_logging import logger
+
+APP_NAME = "Hush"
+
+
+def signal_handler(sig, frame):
+    logger.info("Received Ctrl+C, exiting...")
+
+    gc.running = False
+
+
+def main(replay: Optional[str] = None, synthetic: Optional[str] = None):
+    """Run the loudness engine without any UI. Beeps the same way as the app does until Ctrl+C is pressed.
+
+    Parameters
+    ----------
+    replay : str, optional
+        recording to play through the engine in real time instead of the selected device, stops at the end of the file
+    synthetic : str, optional
+        generated signal (silence, tone or noise) to use instead of the selected device
+    """
+    logger.info(f"Starting {APP_NAME} {__version__} (headless)")
+    signal(SIGINT, signal_handler)
+
+    beeper = Beeper(sj)
+    alert_latency = AlertLatency()
+
+    def on_alert(result: MeterResult):
+        logger.debug(f"Beep! {result.db:.2f} db")
+        played_ns = beeper.play()
+        if played_ns and result.captured_ns:
+            alert_latency.add(result.captured_ns, played_ns)
+
+    engine = HushEngine(sj, on_alert=on_alert)
+    try:
+        beeper.init_with_check()
+        source = None
+        if replay:
+            source = open_recording(replay, sj.cache)
+        elif synthetic:
+            source = SyntheticSource(synthetic)
+
+        if source:
+            engine.open_sources([source])
+        else:
+            engine.open()
+        name = source.name if source else sj.cache["device"]
+        logger.info(f"Monitoring {name}, beep when reaching {sj.cache['beep_when_reach']} db")
+
+        while gc.running and not (source and source.finished.is_set()):
+            sleep(0.5)
+    except Exception as e:
+        logger.exception(e)
+    finally:
+        engine.close()
+        if alert_latency.count:
+            logger.info(f"Capture to beep latency ({sj.cache['latency_profile']}): {alert_latency}")
+        session.terminate()
+        beeper.quit()
+        logger.info("Exit successful")
@@ -0,0 +1,146 @@
+__all__ = ["AGGREGATIONS", "AlertScheduler", "aggregate"]
+from collections import deque
+from typing import Deque, List, Optional, Tuple
+
+IDLE = 0
+ATTACK = 1
+ACTIVE = 2
+
+AGGREGATIONS = ("any", "all", "loudest")
+
+
+def aggregate(levels: List[Tuple[float, Optional[bool]]], policy: str) -> Tuple[float, bool]:
+    """Combine the latest level of several devices into the single level fed to the alert scheduler.
+
+    - any: the loudest device that passes its VAD gate, so any device can trigger the beep
+    - all: the quietest device, so every device must be over the threshold (and pass its gate)
+    - loudest: the loudest device and its own gate, regardless of the other devices
+
+    Parameters
+    ----------
+    levels : List[Tuple[float, Optional[bool]]]
+        db and speech flag (None when VAD is off) of each device
+    policy : str
+        one of `AGGREGATIONS`
+
+    Returns
+    -------
+    Tuple[float, bool]
+        db and gate to feed to `AlertScheduler.update`
+    """
+    if len(levels) == 1:
+        db, is_speech = levels[0]
+        return db, is_speech is not False
+
+    if policy == "all":
+        db = min(level[0] for level in levels)
+        return db, all(level[1] is not False for level in levels)
+
+    if policy == "any":
+        gated = [level[0] for level in levels if level[1] is not False]
+        if gated:
+            return max(gated), True
+
+    db, is_speech = max(levels, key=lambda level: level[0])
+    return db, is_speech is not False
+
+
+class AlertScheduler:
+    """
+    Decide when to beep from a stream of db values.
+
+    - The level must stay over the threshold for `attack_ms` before the alert becomes active
+    - Once active, it is only released when the level drops `release_db` below the threshold (hysteresis)
+    - While active, a beep is fired at most once every `cooldown_ms`
+    - On top of that, no more than `max_per_minute` beeps are fired in any 60 seconds window
+
+    Time is passed in by the caller (in seconds) so it can be driven by the audio clock or by synthetic sequences.
+    """
+    def __init__(
+        self,
+        threshold: float,
+        attack_ms: float = 0,
+        release_db: float = 0,
+        cooldown_ms: float = 0,
+        max_per_minute: float = 0,
+    ):
+        self.threshold = threshold
+        self.attack_ms = attack_ms
+        self.release_db = release_db
+        self.cooldown_ms = cooldown_ms
+        self.max_per_minute = max_per_minute  # 0 means unlimited
+        self.state = IDLE
+        self.attack_start = 0.0
+        self.last_beep = None
+        self.beep_times: Deque[float] = deque()
+
+    def apply_setting(self, setting: dict):
+        """
+        Read the alert parameters from the setting, called on every update so changes apply live
+        """
+        self.threshold = setting["beep_when_reach"]
+        self.attack_ms = setting["beep_attack_ms"]
+        self.release_db = setting["beep_release_db"]
+        self.cooldown_ms = setting["beep_cooldown_ms"]
+        self.max_per_minute = setting["beep_max_per_minute"]
+
+    @property
+    def active(self) -> bool:
+        return self.state == ACTIVE
+
+    def reset(self):
+        self.state = IDLE
+        self.last_beep = None
+        self.beep_times.clear()
+
+    def update(self, db: float, now: float, gate: bool = True) -> bool:
+        """Feed a new level and get wether a beep should be fired now.
+
+        Parameters
+        ----------
+        db : float
+            current level
+        now : float
+            current time in seconds
+        gate : bool
+            False if the level should be ignored (e.g. VAD says it is not speech)
+
+        Returns
+        -------
+        bool
+            True if a beep should be played
+        """
+        over = gate and db >= self.threshold
+
+        if self.state == IDLE and over:
+            self.state = ATTACK
+            self.attack_start = now
+
+        if self.state == ATTACK:
+            if not over:
+                self.state = IDLE
+            elif (now - self.attack_start) * 1000 >= self.attack_ms:
+                self.state = ACTIVE
+
+        if self.state == ACTIVE:
+            if not gate or db < self.threshold - self.release_db:
+                self.state = IDLE
+                return False
+
+            return self.fire(now)
+
+        return False
+
+    def fire(self, now: float) -> bool:
+        if self.last_beep is not None and (now - self.last_beep) * 1000 < self.cooldown_ms:
+            return False
+
+        if self.max_per_minute > 0:
+            while self.beep_times and now - self.beep_times[0] >= 60:
+                self.beep_times.popleft()
+            if len(self.beep_times) >= self.max_per_minute:
+                return False
+            self.beep_times.append(now)
+
+        self.last_beep = now
+        return True
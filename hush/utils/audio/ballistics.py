@@ -0,0 +1,122 @@
+__all__ = ["BALLISTICS", "MeterLevels", "MeterBallistics"]
+import math
+from typing import Dict, NamedTuple, Tuple
+
+import numpy as np
+
+from .level import FULL_SCALE, MIN_DB, as_frames
+
+BALLISTICS = ("Off", "VU", "PPM")  # what the audio meter shows, Off is the plain rms of every chunk
+
+VU_TAU = 0.3 / math.log(100)  # 300 ms to reach 99 % of a step
+PPM_WINDOW = 0.01  # 10 ms integration time
+PPM_DECAY_DB = 24 / 2.8  # IEC 60268-10 type II fall back, 24 dB in 2.8 s
+PEAK_HOLD_S = 1.5
+PEAK_FALL_DB = 20.0  # per second after the hold time
+_MIN_AMP = 10**(MIN_DB / 20)
+
+
+class MeterLevels(NamedTuple):
+    vu: float  # dBFS, rms integrated with the VU rise time
+    ppm: float  # dBFS, quasi peak with 10 ms integration and a slow fall back, a sine reads its peak
+    peak: float  # dBFS, sample peak of the chunk
+    peak_hold: float  # dBFS, highest recent peak, held then falling
+
+    def get(self, ballistics: str, db: float) -> float:
+        """
+        Level to show for the `ballistics` setting, `db` is the unweighted chunk level used when it is Off
+        """
+        if ballistics == "VU":
+            return self.vu
+        if ballistics == "PPM":
+            return self.ppm
+        return db
+
+
+class MeterBallistics:
+    """
+    Meter ballistics computed from the samples of every chunk, the state is kept per channel and carried across chunks.
+
+    Every integrator is evaluated in closed form for the whole chunk instead of sample by sample:
+    the VU integrator is a first order low pass on the power, its value at the end of the chunk is `a^n * state` plus
+    a dot product of the squared samples with precomputed weights. The PPM takes the quasi peak of 10 ms windows and
+    falls back linearly in dB, so its value at the end of the chunk is the largest window level minus the decay since
+    that window.
+    """
+    def __init__(self, sample_rate: int, channels: int = 1, dtype: str = "int16"):
+        self.sample_rate = sample_rate
+        self.channels = channels
+        self.dtype = dtype
+        self.full_scale = FULL_SCALE[dtype]
+        self.vu_power = np.zeros(channels)  # normalized power
+        self.ppm_amp = np.zeros(channels)  # normalized amplitude
+        self.hold_db = MIN_DB
+        self.hold_age = 0.0  # seconds since the held peak was set
+        self.cache: Dict[int, Tuple] = {}
+
+    def reset(self):
+        self.vu_power[:] = 0
+        self.ppm_amp[:] = 0
+        self.hold_db = MIN_DB
+        self.hold_age = 0.0
+
+    def coefficients(self, n: int) -> Tuple:
+        """
+        Everything that only depends on the chunk length: the VU state decay and sample weights, the PPM window starts,
+        lengths and decay to the end of the chunk, and the PPM state decay over the chunk
+        """
+        if n not in self.cache:
+            a = math.exp(-1 / (self.sample_rate * VU_TAU))
+            weights = ((1 - a) * a**np.arange(n - 1, -1, -1)).astype(np.float32)
+            windows = max(1, round(n / (self.sample_rate * PPM_WINDOW)))
+            bounds = np.linspace(0, n, windows + 1).astype(np.intp)
+            # decay from the end of each window to the end of the chunk, as an amplitude factor
+            seconds_left = (n - bounds[1:]) / self.sample_rate
+            window_decay = (10**(-PPM_DECAY_DB * seconds_left / 20))[:, None]
+            chunk_decay = 10**(-PPM_DECAY_DB * n / self.sample_rate / 20)
+            self.cache[n] = (a**n, weights, bounds[:-1], np.diff(bounds)[:, None], window_decay, chunk_decay)
+
+        return self.cache[n]
+
+    def process(self, in_data) -> MeterLevels:
+        """Update the ballistics with a chunk of interleaved audio data.
+
+        Parameters
+        ----------
+        in_data : bytes | memoryview | np.ndarray
+            interleaved audio data
+
+        Returns
+        -------
+        MeterLevels
+            levels at the end of the chunk, the loudest channel of each
+        """
+        frames = as_frames(in_data, self.dtype, self.channels)
+        n = frames.shape[0]
+        if n == 0:
+            return self.levels(MIN_DB)
+
+        x = frames.astype(np.float32)
+        sq = x * x
+        sq *= np.float32(1 / self.full_scale**2)
+        vu_decay, weights, starts, lengths, window_decay, ppm_decay = self.coefficients(n)
+
+        self.vu_power = vu_decay * self.vu_power + weights @ sq
+
+        quasi_peak = np.sqrt(2 * np.add.reduceat(sq, starts, axis=0) / lengths)  # (windows, channels)
+        self.ppm_amp = np.maximum(self.ppm_amp * ppm_decay, (quasi_peak * window_decay).max(axis=0))
+
+        peak_db = 10 * math.log10(max(float(sq.max()), _MIN_AMP**2))
+        seconds = n / self.sample_rate
+        if peak_db >= self.hold_db - PEAK_FALL_DB * max(0.0, self.hold_age + seconds - PEAK_HOLD_S):
+            self.hold_db, self.hold_age = peak_db, 0.0
+        else:
+            self.hold_age += seconds
+
+        return self.levels(peak_db)
+
+    def levels(self, peak_db: float) -> MeterLevels:
+        vu = 10 * math.log10(max(float(self.vu_power.max()), _MIN_AMP**2))
+        ppm = 20 * math.log10(max(float(self.ppm_amp.max()), _MIN_AMP))
+        hold = max(MIN_DB, self.hold_db - PEAK_FALL_DB * max(0.0, self.hold_age - PEAK_HOLD_S))
+        return MeterLevels(vu, ppm, peak_db, hold)
@@ -0,0 +1,62 @@
+import os
+from time import perf_counter_ns
+
+from hush._path import beep_default
+from hush.custom_logging import logger
+
+
+class Beeper:
+    """
+    Small wrapper around the pygame mixer used to play the beep sound. pygame is only imported when the mixer is first
+    initialized, which is when monitoring starts, so starting the app does not load SDL.
+    """
+    def __init__(self, sj):
+        self.sj = sj
+        self._mixer = None
+
+    @property
+    def mixer(self):
+        if self._mixer is None:
+            os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+            from pygame import mixer
+
+            self._mixer = mixer
+        return self._mixer
+
+    def get_sound_path(self) -> str:
+        return self.sj.cache["custom_beep_path"] if self.sj.cache["custom_beep_path"] != "" else beep_default
+
+    def init_with_check(self):
+        try:
+            if self.mixer.get_init() is None:
+                logger.debug("Initializing mixer...")
+                self.mixer.init()
+                self.mixer.music.load(self.get_sound_path())
+        except Exception as e:
+            logger.exception(e)
+
+    def load(self, path: str):
+        self.init_with_check()
+        self.mixer.music.load(path)
+
+    def play(self) -> int:
+        """
+        Play the beep, returns the perf_counter_ns time it was handed to the mixer, 0 if it failed
+        """
+        if self._mixer is None:
+            self.init_with_check()
+        try:
+            self.mixer.music.set_volume(self.sj.cache["beep_volume"] / 100)
+            self.mixer.music.play(start=0.1)
+            return perf_counter_ns()
+        except Exception as e:
+            logger.exception(e)
+            return 0
+
+    def quit(self):
+        if self._mixer is None:  # never initialized
+            return
+        try:
+            self.mixer.quit()
+        except Exception as e:
+            logger.exception(e)
@@ -0,0 +1,108 @@
+__all__ = ["SAMPLE_RATES", "CHANNELS", "DeviceCapabilities", "CapabilityProbe", "capabilities"]
+from itertools import product
+from time import perf_counter
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+from hush.custom_logging import logger
+from hush.utils.audio.registry import DeviceRecord
+from hush.utils.audio.session import AudioSession, session
+
+SAMPLE_RATES = (8000, 16000, 32000, 48000)  # the rates webrtcvad accepts
+CHANNELS = (1, 2)
+PREFERRED_MIN_RATE = 16000  # 8 kHz works for the VAD but cuts the weighting filters, only used when nothing else is
+
+
+class DeviceCapabilities(NamedTuple):
+    """
+    int16 capture configs a device accepts, as (sample rate, channels)
+    """
+    key: str
+    supported: Tuple[Tuple[int, int], ...]
+
+    def supports(self, sample_rate: int, channels: int) -> bool:
+        return (sample_rate, channels) in self.supported
+
+    def rates(self) -> List[int]:
+        return [r for r in SAMPLE_RATES if any(rate == r for rate, _ in self.supported)]
+
+    def channels(self, sample_rate: int) -> List[int]:
+        return [c for r, c in self.supported if r == sample_rate]
+
+    def cheapest(self) -> Optional[Tuple[int, int]]:
+        """
+        Config with the least samples per second, at 16 kHz or more if possible and mono over stereo
+        """
+        if not self.supported:
+            return None
+        return min(self.supported, key=lambda rc: (rc[0] < PREFERRED_MIN_RATE, rc[0] * rc[1], rc[1]))
+
+
+class CapabilityProbe:
+    """
+    Asks PortAudio which rate and channel combinations a device supports, once per device.
+
+    Results are cached by the stable device key, so they survive device rescans and renumbering. Only int16 is probed,
+    it is the only sample format the analysis pipeline reads.
+    """
+    def __init__(self, session: AudioSession):
+        self.session = session
+        self.cache: Dict[str, DeviceCapabilities] = {}
+
+    def get(self, record: DeviceRecord) -> DeviceCapabilities:
+        caps = self.cache.get(record.key)
+        if caps is None:
+            caps = self.probe(record)
+            self.cache[record.key] = caps
+        return caps
+
+    def probe(self, record: DeviceRecord) -> DeviceCapabilities:
+        import pyaudio
+
+        p = self.session.p
+        start = perf_counter()
+        supported = []
+        for sample_rate, channels in product(SAMPLE_RATES, CHANNELS):
+            if channels > record.channels:
+                continue
+            try:
+                if p.is_format_supported(
+                    sample_rate, input_device=record.index, input_channels=channels, input_format=pyaudio.paInt16
+                ):
+                    supported.append((sample_rate, channels))
+            except ValueError:  # raised with the reason when the format is not supported
+                pass
+        logger.debug(f"Probed {record.name} in {(perf_counter() - start) * 1000:.1f} ms, supports {supported}")
+        return DeviceCapabilities(record.key, tuple(supported))
+
+    def choose(self, record: DeviceRecord, sample_rate: int, channels: int) -> Tuple[int, int]:
+        """Config to open a device with, the wanted one if the device supports it, else the cheapest it supports.
+
+        Parameters
+        ----------
+        record : DeviceRecord
+            device to open
+        sample_rate : int
+            wanted sample rate
+        channels : int
+            wanted number of channels
+
+        Returns
+        -------
+        Tuple[int, int]
+            sample rate and channels to use. The wanted ones if the probe found nothing, so the open reports the error
+        """
+        caps = self.get(record)
+        if caps.supports(sample_rate, channels):
+            return sample_rate, channels
+
+        cheapest = caps.cheapest()
+        if cheapest is None:
+            return sample_rate, channels
+        logger.warning(
+            f"{record.name} does not support {sample_rate} Hz, {channels} channel(s), "
+            f"using {cheapest[0]} Hz, {cheapest[1]} channel(s)"
+        )
+        return cheapest
+
+
+capabilities = CapabilityProbe(session)
@@ -1,9 +1,13 @@
-from audioop import rms as calculate_rms
-from numpy import log10
+from typing import Optional
 
-import pyaudio
+import numpy as np
 
 from hush.custom_logging import logger
+from hush.utils.audio.capability import capabilities
+from hush.utils.audio.latency import get_profile
+from hush.utils.audio.level import FULL_SCALE, MIN_DB, get_rms_db
+from hush.utils.audio.registry import registry
+from hush.utils.audio.session import session
 
 
 def get_db(audio_data: bytes) -> float:
@@ -17,16 +21,49 @@ def get_db(audio_data: bytes) -> float:
     Returns
     -------
     float
-        db value of the audio data
+        db value of the audio data, `MIN_DB` for digital silence like the weighted levels
     """
-    rms: float = calculate_rms(audio_data, 2) / 32767
-    if rms == 0.0:
-        return 0.0
+    return get_rms_db(audio_data, "int16")
+
+
+def get_db_batch(audio_data: bytes, chunk_samples: int) -> np.ndarray:
+    """Get the db value of every chunk of the audio data in one vectorized step, the same values `get_db` gives.
+
+    Parameters
+    ----------
+    audio_data : bytes
+        several chunks of int16 audio data, read at once
+    chunk_samples : int
+        samples per chunk (frames times channels), the length of the audio data must be a multiple of it
+
+    Returns
+    -------
+    np.ndarray
+        db value of each chunk
+    """
+    samples = np.frombuffer(audio_data, dtype=np.int16).reshape(-1, chunk_samples).astype(np.float32)
+    power = np.einsum("ij,ij->i", samples, samples) / (chunk_samples * FULL_SCALE["int16"]**2)
+    silent = power <= 10**(MIN_DB / 10)
+    db = 10 * np.log10(np.where(silent, 1.0, power))
+    db[silent] = MIN_DB  # same as get_db
+    return db
+
+
+CHANNEL_NAMES = {1: "Mono", 2: "Stereo"}  # shown in the channel combobox and saved in the setting
+
+
+def get_channel_int(channel_string: str):
+    if channel_string.isdigit():
+        return int(channel_string)
+    elif channel_string.lower() == "mono":
+        return 1
+    elif channel_string.lower() == "stereo":
+        return 2
     else:
-        return 20 * log10(rms)  # convert to db
+        raise ValueError("Invalid channel string")
 
 
-def get_device_details(sj, p: pyaudio.PyAudio):
+def get_device_details(sj, device: Optional[str] = None):
     """
     Function to get the device detail, chunk size, sample rate, and number of channels.
 
@@ -34,37 +71,36 @@ def get_device_details(sj, p: pyaudio.PyAudio):
     ----
     sj: dict
         setting object
-    p: pyaudio.PyAudio
-        PyAudio object
+    device: str, optional
+        device string to use, defaults to the selected device in the setting
 
     Returns
     ----
     bool
         True if success, False if failed
     dict
-        device detail, chunk size, sample rate, and number of channels
+        device record, chunk size, sample rate, and number of channels
     """
     try:
-        device = sj.cache["device"]
-
-        # get the id in device string [ID: deviceIndex,hostIndex]
-        id = device.split("[ID: ")[1]  # first get the id bracket
-        id = id.split("]")[0]  # then get the id
-        deviceIndex = id.split(",")[0]
-        hostIndex = id.split(",")[1]
-
-        device_detail = p.get_device_info_by_host_api_device_index(int(deviceIndex), int(hostIndex))
-
-        # https://github.com/wiseman/py-webrtcvad/issues/30
-        chunk_size = 480  # hard coded chunk size. no need for this to be changeable, we are just detecting speech and db
-        sample_rate = int(sj.cache["sample_rate"])
-        num_of_channels = str(sj.cache["channel"])
-        logger.debug(f"Device: ({device_detail['index']}) {device_detail['name']}")
+        if device is None:
+            device = sj.cache["device"]
+
+        record = registry.resolve(device, sj.cache["device_keys"].get(device))
+        if record is None:
+            raise IOError(f"Device {device} is not connected")
+
+        # the selected format, or the cheapest one the device supports if it does not support that one
+        wanted_rate, wanted_channels = int(sj.cache["sample_rate"]), get_channel_int(sj.cache["channel"])
+        sample_rate, channels = capabilities.choose(record, wanted_rate, wanted_channels)
+        # same duration at every rate, https://github.com/wiseman/py-webrtcvad/issues/30
+        chunk_size = get_profile(sj.cache["latency_profile"]).chunk_size(sample_rate)
+        num_of_channels = str(channels)
+        logger.debug(f"Device: ({record.index}) {record.name}")
         logger.debug(f"Sample Rate {sample_rate} | channels {num_of_channels} | chunk size {chunk_size}")
-        logger.debug(f"Actual device detail: {device_detail}")
+        logger.debug(f"Actual device detail: {record}")
 
         return True, {
-            "device_detail": device_detail,
+            "device": record,
             "chunk_size": chunk_size,
             "sample_rate": sample_rate,
             "num_of_channels": num_of_channels,
@@ -73,7 +109,7 @@ def get_device_details(sj, p: pyaudio.PyAudio):
         logger.error("Something went wrong while trying to get the device details.")
         logger.exception(e)
         return False, {
-            "device_detail": {},
+            "device": None,
             "chunk_size": 0,
             "sample_rate": 0,
             "num_of_channels": 0,
@@ -82,20 +118,14 @@ def get_device_details(sj, p: pyaudio.PyAudio):
 
 def get_input_devices(hostAPI: str):
     """
-    Get the input devices (mic) from the specified hostAPI.
+    Get the input devices (mic) from the specified hostAPI. Served from the device registry.
     """
     devices = []
-    p = pyaudio.PyAudio()
     try:
-        for i in range(p.get_host_api_count()):
-            current_api_info = p.get_host_api_info_by_index(i)
-            # This will ccheck hostAPI parameter
-            # If it is empty, get all devices. If specified, get only the devices from the specified hostAPI
-            if (hostAPI == current_api_info["name"]) or (hostAPI == ""):
-                for j in range(int(current_api_info["deviceCount"])):
-                    device = p.get_device_info_by_host_api_device_index(i, j)  # get device info by host api device index
-                    if int(device["maxInputChannels"]) > 0:
-                        devices.append(f"[ID: {i},{j}] | {device['name']}")  # j is the device index in the host api
+        session.lookup()
+        # If hostAPI is empty, get all devices. If specified, get only the devices from the specified hostAPI
+        records = [r for r in registry.records() if hostAPI in (r.host_api, "")]
+        devices = [r.label for r in sorted(records, key=lambda r: (r.host_api_index, r.host_device_index))]
 
         if len(devices) == 0:  # check if input empty or not
             devices = ["[WARNING] No input devices found."]
@@ -104,19 +134,17 @@ def get_input_devices(hostAPI: str):
         logger.exception(e)
         devices = ["[ERROR] Check the terminal/log for more information."]
     finally:
-        p.terminate()
         return devices
 
 
 def get_host_apis():
     """
-    Get the host apis from the system.
+    Get the host apis from the system. Served from the audio session cache.
     """
     apis = []
-    p = pyaudio.PyAudio()
     try:
-        for i in range(p.get_host_api_count()):
-            current_api_info = p.get_host_api_info_by_index(i)
+        session.lookup()
+        for current_api_info in session.host_apis:
             apis.append(f"{current_api_info['name']}")
 
         if len(apis) == 0:  # check if input empty or not
@@ -126,12 +154,11 @@ def get_host_apis():
         logger.exception(e)
         apis = ["[ERROR] Check the terminal/log for more information."]
     finally:
-        p.terminate()
         return apis
 
 
 def get_default_input_device():
-    """Get the default input device (mic).
+    """Get the default input device (mic). Served from the audio session cache.
 
     Returns
     -------
@@ -140,11 +167,13 @@ def get_default_input_device():
     str | dict
         Default input device detail. If failed, return the error message (str).
     """
-    p = pyaudio.PyAudio()
     sucess = False
     default_device = None
     try:
-        default_device = p.get_default_input_device_info()
+        session.lookup()
+        if session.default_input is None:
+            raise OSError(session.default_input_error)
+        default_device = session.default_input
         sucess = True
     except Exception as e:
         if "Error querying device -1" in str(e):
@@ -156,12 +185,11 @@ def get_default_input_device():
             logger.exception(e)
             default_device = str(e)
     finally:
-        p.terminate()
         return sucess, default_device
 
 
 def get_default_host_api():
-    """Get the default host api.
+    """Get the default host api. Served from the audio session cache.
 
     Returns
     -------
@@ -170,16 +198,17 @@ def get_default_host_api():
     str | dict
         Default host api detail. If failed, return the error message (str).
     """
-    p = pyaudio.PyAudio()
     sucess = False
     default_host_api = None
     try:
-        default_host_api = p.get_default_host_api_info()
+        session.lookup()
+        if session.default_host_api is None:
+            raise OSError("No default host api found.")
+        default_host_api = session.default_host_api
         sucess = True
     except OSError as e:
         logger.error("Something went wrong while trying to get the default host api.")
         logger.exception(e)
         default_host_api = str(e)
     finally:
-        p.terminate()
         return sucess, default_host_api
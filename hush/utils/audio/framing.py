@@ -0,0 +1,101 @@
+__all__ = ["VAD_RATES", "VAD_FRAME_MS", "FrameAdapter"]
+from typing import List
+
+import numpy as np
+
+VAD_RATES = (8000, 16000, 32000, 48000)  # sample rates accepted by webrtcvad
+VAD_FRAME_MS = (10, 20, 30)  # frame durations accepted by webrtcvad
+
+
+class FrameAdapter:
+    """
+    Turn interleaved int16 chunks of any size and channel count into mono frames that webrtcvad accepts.
+
+    - Mono input is used as is, multi channel input is averaged from strided column views straight into the carry
+      buffer, so no intermediate array is allocated per chunk
+    - Chunks are cut into frames of `frame_ms`, leftover samples are kept for the next chunk
+
+    The returned frames are memoryviews into an internal buffer, they are only valid until the next call to `push`.
+    """
+    def __init__(self, sample_rate: int, channels: int = 1, frame_ms: int = 30):
+        if sample_rate not in VAD_RATES:
+            raise ValueError(f"Sample rate {sample_rate} is not supported by the VAD, use one of {VAD_RATES}")
+        if frame_ms not in VAD_FRAME_MS:
+            raise ValueError(f"Frame duration {frame_ms} ms is not supported by the VAD, use one of {VAD_FRAME_MS}")
+
+        self.sample_rate = sample_rate
+        self.channels = channels
+        self.frame_ms = frame_ms
+        self.frame_len = sample_rate * frame_ms // 1000
+        self.buffer = np.zeros(self.frame_len * 4, dtype=np.int16)
+        self.sum_buffer = np.zeros(0, dtype=np.int32)
+        self.pending = 0  # leftover samples
+        self.carry_from = 0  # where the leftover samples start in the buffer
+
+    def reset(self):
+        self.pending = 0
+        self.carry_from = 0
+
+    def reserve(self, n_frames: int):
+        """
+        Make sure the carry buffer can hold the leftover plus a chunk of `n_frames`
+        """
+        needed = self.pending + n_frames
+        if needed > len(self.buffer):
+            grown = np.zeros(max(needed, len(self.buffer) * 2), dtype=np.int16)
+            grown[:self.pending] = self.buffer[:self.pending]
+            self.buffer = grown
+        if self.channels > 1 and len(self.sum_buffer) < n_frames:
+            self.sum_buffer = np.zeros(n_frames, dtype=np.int32)
+
+    def downmix_into(self, samples: np.ndarray, out: np.ndarray):
+        """
+        Average the interleaved channels of `samples` into `out`
+        """
+        frames = samples.reshape(-1, self.channels)
+        acc = self.sum_buffer[:len(out)]
+        np.copyto(acc, frames[:, 0])
+        for c in range(1, self.channels):
+            np.add(acc, frames[:, c], out=acc)
+        np.floor_divide(acc, self.channels, out=out, casting="unsafe")
+
+    def push(self, in_data) -> List[memoryview]:
+        """Add a chunk and get every complete frame available.
+
+        Parameters
+        ----------
+        in_data : bytes
+            interleaved int16 audio data
+
+        Returns
+        -------
+        List[memoryview]
+            complete mono int16 frames (as byte views), can be empty if there is not enough audio yet
+        """
+        samples = np.frombuffer(in_data, dtype=np.int16)
+        n_frames = len(samples) // self.channels
+
+        # the leftover is moved to the front only now, so the views returned by the previous call stayed valid
+        if self.carry_from:
+            self.buffer[:self.pending] = self.buffer[self.carry_from:self.carry_from + self.pending]
+            self.carry_from = 0
+
+        # fast path, mono chunk that is exactly one frame with nothing left over
+        if self.channels == 1 and self.pending == 0 and n_frames == self.frame_len:
+            return [memoryview(in_data).cast("B")]
+
+        self.reserve(n_frames)
+        dest = self.buffer[self.pending:self.pending + n_frames]
+        if self.channels == 1:
+            dest[:] = samples
+        else:
+            self.downmix_into(samples, dest)
+        total = self.pending + n_frames
+
+        n_complete = total // self.frame_len
+        frames = [
+            memoryview(self.buffer[i * self.frame_len:(i + 1) * self.frame_len]).cast("B") for i in range(n_complete)
+        ]
+        self.pending = total - n_complete * self.frame_len
+        self.carry_from = n_complete * self.frame_len if self.pending else 0
+        return frames
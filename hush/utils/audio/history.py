@@ -0,0 +1,106 @@
+__all__ = ["HISTORY_WINDOWS", "HISTORY_POINTS", "LevelHistory"]
+from threading import Lock
+from typing import Dict, Sequence, Tuple
+
+import numpy as np
+
+HISTORY_WINDOWS = (60, 300, 1800)  # seconds, 1, 5 and 30 minutes
+HISTORY_POINTS = 600  # bins per window, whatever its length
+
+
+class _MinMaxRing:
+    """
+    Fixed size ring of min / max bins of `bin_seconds` each, plus the bin that is still being filled
+    """
+    def __init__(self, size: int, bin_seconds: float):
+        self.size = size
+        self.bin_seconds = bin_seconds
+        self.mins = np.full(size, np.nan)
+        self.maxs = np.full(size, np.nan)
+        self.pos = 0  # next bin to write
+        self.bin_index = -1  # time index of the bin being filled, -1 before the first value
+        self.cur_min = np.inf
+        self.cur_max = -np.inf
+
+    def add(self, value: float, t: float):
+        index = int(t // self.bin_seconds)
+        if self.bin_index < 0:
+            self.bin_index = index
+        elif index > self.bin_index:
+            self.commit(self.cur_min, self.cur_max)
+            self.gap(index - self.bin_index - 1)
+            self.bin_index = index
+            self.cur_min, self.cur_max = np.inf, -np.inf
+
+        self.cur_min = min(self.cur_min, value)
+        self.cur_max = max(self.cur_max, value)
+
+    def commit(self, lo: float, hi: float):
+        self.mins[self.pos] = lo
+        self.maxs[self.pos] = hi
+        self.pos = (self.pos + 1) % self.size
+
+    def gap(self, bins: int):
+        """
+        Bins without any value, e.g. while the stream was stopped
+        """
+        if bins <= 0:
+            return
+        idx = (self.pos + np.arange(min(bins, self.size))) % self.size
+        self.mins[idx] = np.nan
+        self.maxs[idx] = np.nan
+        self.pos = (self.pos + bins) % self.size
+
+    def ordered(self) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Oldest to newest, the last point is the bin still being filled
+        """
+        order = (self.pos + 1 + np.arange(self.size)) % self.size  # skip the oldest to make room for the current bin
+        mins, maxs = self.mins[order], self.maxs[order]
+        if self.cur_min <= self.cur_max:
+            mins[-1], maxs[-1] = self.cur_min, self.cur_max
+        else:
+            mins[-1] = maxs[-1] = np.nan
+        return mins, maxs
+
+
+class LevelHistory:
+    """
+    Loudness history at several time resolutions, in preallocated ring buffers.
+
+    Every window keeps the min and max of each of its `points` bins, so reading 30 minutes costs the same as reading 1
+    minute, and the memory stays the same however long the session runs. `add` is called from the audio side, `get`
+    from the UI, both are thread safe. Time is in seconds on any monotonic clock, bins without values are NaN.
+    """
+    def __init__(self, windows: Sequence[int] = HISTORY_WINDOWS, points: int = HISTORY_POINTS):
+        self.lock = Lock()
+        self.rings: Dict[int, _MinMaxRing] = {w: _MinMaxRing(points, w / points) for w in windows}
+        self.version = 0  # increased on every add, lets the UI skip redraws when nothing changed
+
+    def add(self, db: float, t: float):
+        with self.lock:
+            for ring in self.rings.values():
+                ring.add(db, t)
+            self.version += 1
+
+    def get(self, window: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Min and max db of every bin of a window.
+
+        Parameters
+        ----------
+        window : int
+            window length in seconds, one of the windows given on creation
+
+        Returns
+        -------
+        Tuple[np.ndarray, np.ndarray]
+            copies of the min and max arrays, oldest to newest, NaN where there was no audio
+        """
+        with self.lock:
+            return self.rings[window].ordered()
+
+    def clear(self):
+        with self.lock:
+            for window, ring in self.rings.items():
+                self.rings[window] = _MinMaxRing(ring.size, ring.bin_seconds)
+            self.version += 1
@@ -0,0 +1,67 @@
+__all__ = ["PULL_READ_MS", "LatencyProfile", "LATENCY_PROFILES", "get_profile", "AlertLatency"]
+from typing import NamedTuple
+
+from hush.custom_logging import logger
+
+
+PULL_READ_MS = 120  # audio per blocking read in pull capture, each read wakes python up once
+
+
+class LatencyProfile(NamedTuple):
+    """
+    Buffer sizes of a capture, as durations so every sample rate gets the same latency and the same callback rate
+    """
+    name: str
+    chunk_ms: int  # frames_per_buffer of the stream
+    vad_frame_ms: int  # 10, 20 or 30, the frame lengths webrtcvad accepts
+
+    def chunk_size(self, sample_rate: int) -> int:
+        return sample_rate * self.chunk_ms // 1000
+
+    def pull_batch(self) -> int:
+        """
+        Chunks read at once in pull capture, about `PULL_READ_MS` of audio per read
+        """
+        return max(1, PULL_READ_MS // self.chunk_ms)
+
+
+LATENCY_PROFILES = {
+    "low-latency": LatencyProfile("low-latency", 10, 10),  # 100 callbacks per second
+    "balanced": LatencyProfile("balanced", 30, 30),  # the previous 480 frames at 16 kHz
+    "low-power": LatencyProfile("low-power", 100, 30),  # 10 callbacks per second
+}
+
+
+def get_profile(name: str) -> LatencyProfile:
+    return LATENCY_PROFILES.get(name, LATENCY_PROFILES["balanced"])
+
+
+class AlertLatency:
+    """
+    Capture to beep latency of the alerts: from the time the first sample of the chunk that triggered the alert reached
+    the ADC (PortAudio `input_buffer_adc_time`) to the time the beep was handed to the output. Both are on the
+    `perf_counter_ns` clock. The buffering of the output device itself is not included.
+    """
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.last_ms = 0.0
+
+    def add(self, captured_ns: int, played_ns: int) -> float:
+        ms = (played_ns - captured_ns) / 1e6
+        self.count += 1
+        self.total_ms += ms
+        self.max_ms = max(self.max_ms, ms)
+        self.last_ms = ms
+        logger.debug(f"Capture to beep latency {ms:.1f} ms")
+        return ms
+
+    def mean_ms(self) -> float:
+        return self.total_ms / self.count if self.count else 0.0
+
+    def __str__(self):
+        return f"alerts {self.count} | last {self.last_ms:.1f} ms | mean {self.mean_ms():.1f} ms | max {self.max_ms:.1f} ms"
@@ -0,0 +1,151 @@
+__all__ = ["FULL_SCALE", "MIN_DB", "as_frames", "get_rms_db", "get_levels", "get_levels_batch"]
+import math
+from typing import Sequence, Tuple
+
+import numpy as np
+
+# value of a full scale sample for each supported sample format, 0 dBFS
+FULL_SCALE = {"int16": 32768.0, "int32": 2147483648.0, "float32": 1.0}
+MIN_DB = -120.0  # floor used for digital silence so log10 never sees 0
+_MIN_POWER = 10**(MIN_DB / 10)
+_MIN_PEAK = 10**(MIN_DB / 20)
+_FULL_SCALE_POWER = {dtype: full_scale * full_scale for dtype, full_scale in FULL_SCALE.items()}
+
+
+def as_frames(audio_data, dtype: str = "int16", channels: int = 1) -> np.ndarray:
+    """Zero-copy view of the audio data as a (frames, channels) array.
+
+    Parameters
+    ----------
+    audio_data : bytes | memoryview | np.ndarray
+        interleaved audio data
+    dtype : str
+        sample format, one of int16, int32, float32
+    channels : int
+        number of interleaved channels
+
+    Returns
+    -------
+    np.ndarray
+        read only view of shape (frames, channels)
+    """
+    if isinstance(audio_data, np.ndarray):
+        return audio_data.reshape(-1, channels)
+    return np.frombuffer(audio_data, dtype=dtype).reshape(-1, channels)
+
+
+def get_rms_db(audio_data, dtype: str = "int16") -> float:
+    """Get the rms dBFS of all samples in the audio data, regardless of channel.
+
+    This is the fast path for a single chunk, it skips the per channel reshaping done by `get_levels`. The cost of a
+    480 frame chunk is mostly the fixed overhead of the NumPy calls, so there are only three of them and they get
+    positional arguments only (keyword parsing costs as much as the sum of squares at this size).
+
+    Parameters
+    ----------
+    audio_data : bytes | memoryview | np.ndarray
+        audio data
+    dtype : str
+        sample format, one of int16, int32, float32
+
+    Returns
+    -------
+    float
+        rms level in dBFS, `MIN_DB` if silent
+    """
+    samples = audio_data.ravel() if isinstance(audio_data, np.ndarray) else np.frombuffer(audio_data, dtype)
+    n = samples.size
+    if n == 0:
+        return MIN_DB
+
+    f = samples.astype(np.float32)  # float32 dot is the cheapest sum of squares, int32 is not BLAS backed
+    power = float(np.dot(f, f)) / (n * _FULL_SCALE_POWER[dtype])
+    if power <= _MIN_POWER:
+        return MIN_DB
+
+    return 10 * math.log10(power)
+
+
+def _levels(frames: np.ndarray, full_scale: float) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    rms and peak dBFS over the frame axis (second to last) of a (..., frames, channels) array
+    """
+    # reductions are done on a contiguous last axis, strided reductions over interleaved channels are much slower
+    if frames.shape[-1] == 1:
+        x = frames[..., 0]
+    else:
+        x = np.ascontiguousarray(np.swapaxes(frames, -1, -2))
+
+    f = x.astype(np.float32, copy=False)
+    power = np.einsum("...i,...i->...", f, f) / (x.shape[-1] * full_scale**2)
+    # max and min on the raw samples, integer reductions are cheaper and -32768 can't overflow after the cast
+    peak = np.maximum(x.max(axis=-1).astype(np.float32), -(x.min(axis=-1).astype(np.float32))) / full_scale
+
+    rms_db = 10 * np.log10(np.maximum(power, _MIN_POWER))
+    peak_db = 20 * np.log10(np.maximum(peak, _MIN_PEAK))
+    return rms_db, peak_db
+
+
+def get_levels(audio_data, dtype: str = "int16", channels: int = 1) -> Tuple[np.ndarray, np.ndarray]:
+    """Get per channel rms and peak dBFS of a single chunk.
+
+    Parameters
+    ----------
+    audio_data : bytes | memoryview | np.ndarray
+        interleaved audio data
+    dtype : str
+        sample format, one of int16, int32, float32
+    channels : int
+        number of interleaved channels
+
+    Returns
+    -------
+    Tuple[np.ndarray, np.ndarray]
+        rms dBFS and peak dBFS, each of shape (channels,)
+    """
+    frames = as_frames(audio_data, dtype, channels)
+    n = frames.shape[0]
+    rms_db, peak_db = [MIN_DB] * channels, [MIN_DB] * channels
+    if n == 0:
+        return np.array(rms_db), np.array(peak_db)
+
+    # one channel at a time with scalar math, the array version in `_levels` has too many NumPy calls for one chunk.
+    # argmax / argmin skip the ufunc reduction machinery, which costs more than the reduction itself at this size
+    full_scale = FULL_SCALE[dtype]
+    for c in range(channels):
+        x = frames[:, c]
+        f = x.astype(np.float32)
+        power = float(np.dot(f, f)) / (n * _FULL_SCALE_POWER[dtype])
+        peak = max(float(x[x.argmax()]), -float(x[x.argmin()])) / full_scale
+        if power > _MIN_POWER:
+            rms_db[c] = 10 * math.log10(power)
+        if peak > _MIN_PEAK:
+            peak_db[c] = 20 * math.log10(peak)
+    return np.array(rms_db), np.array(peak_db)
+
+
+def get_levels_batch(chunks: Sequence, dtype: str = "int16", channels: int = 1) -> Tuple[np.ndarray, np.ndarray]:
+    """Get per channel rms and peak dBFS of many equally sized chunks in one call.
+
+    Parameters
+    ----------
+    chunks : Sequence[bytes] | np.ndarray
+        list of chunks with the same length, or an array of shape (n_chunks, frames * channels)
+    dtype : str
+        sample format, one of int16, int32, float32
+    channels : int
+        number of interleaved channels
+
+    Returns
+    -------
+    Tuple[np.ndarray, np.ndarray]
+        rms dBFS and peak dBFS, each of shape (n_chunks, channels)
+    """
+    if isinstance(chunks, np.ndarray):
+        block = chunks.reshape(chunks.shape[0], -1, channels)
+    else:
+        if len(chunks) == 0:
+            return np.empty((0, channels)), np.empty((0, channels))
+        block = np.frombuffer(b"".join(chunks), dtype=dtype).reshape(len(chunks), -1, channels)
+
+    return _levels(block, FULL_SCALE[dtype])
@@ -0,0 +1,211 @@
+__all__ = ["DeviceRecord", "DeviceRegistry", "device_key", "parse_label", "registry"]
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+from hush.custom_logging import logger
+from hush.utils.audio.session import AudioSession, session
+
+
+def device_key(host_api: str, name: str, channels: int) -> str:
+    """
+    Stable identity of an input device, PortAudio indices change when devices are added, removed or reordered
+    """
+    return f"{host_api}|{name}|{channels}"
+
+
+def parse_label(label: str) -> Optional[Tuple[int, int]]:
+    """
+    Host API index and device index in the host API of a "[ID: i,j] | name" label, None if it is not one
+    """
+    if not label.startswith("[ID: ") or "]" not in label:
+        return None
+    try:
+        i, j = label[5:label.index("]")].split(",")
+        return int(i), int(j)
+    except ValueError:
+        return None
+
+
+@dataclass
+class DeviceRecord:
+    """
+    Input device as found in the last scan
+    """
+    __slots__ = ("host_api", "name", "channels", "index", "host_api_index", "host_device_index", "default_sample_rate")
+    host_api: str
+    name: str
+    channels: int  # max input channels
+    index: int  # PortAudio device index
+    host_api_index: int
+    host_device_index: int  # index of the device in its host API
+    default_sample_rate: float
+
+    @classmethod
+    def from_info(cls, info: Dict, host_api: str) -> "DeviceRecord":
+        return cls(
+            host_api,
+            info["name"],
+            int(info["maxInputChannels"]),
+            int(info["index"]),
+            int(info["hostApi"]),
+            int(info["hostApiDeviceIndex"]),
+            float(info["defaultSampleRate"]),
+        )
+
+    @property
+    def key(self) -> str:
+        return device_key(self.host_api, self.name, self.channels)
+
+    @property
+    def label(self) -> str:
+        """
+        Text shown in the device list and saved in the setting
+        """
+        return f"[ID: {self.host_api_index},{self.host_device_index}] | {self.name}"
+
+
+class DeviceRegistry:
+    """
+    Input devices of the audio session, by stable key and by position.
+
+    The maps are rebuilt from the session cache whenever the session rescanned. `resolve` first checks the position
+    written in the saved label with a single PortAudio query, so a saved device is found at startup without
+    enumerating every host API. Only when the device there is not the saved one are all devices scanned, and the
+    device is found again by its key wherever PortAudio put it.
+    """
+    def __init__(self, session: AudioSession):
+        self.session = session
+        self.by_key: Dict[str, DeviceRecord] = {}
+        self.by_location: Dict[Tuple[int, int], DeviceRecord] = {}
+        self.scan = -1  # session scan the maps were built from
+
+    def records(self) -> List[DeviceRecord]:
+        self.update()
+        return list(self.by_location.values())
+
+    def update(self):
+        self.session.enumerate()
+        if self.scan == self.session.scans:
+            return
+
+        host_names = [api["name"] for api in self.session.host_apis]
+        self.by_key, self.by_location = {}, {}
+        for info in self.session.devices:
+            if int(info["maxInputChannels"]) > 0:
+                record = DeviceRecord.from_info(info, host_names[info["hostApi"]])
+                self.by_key.setdefault(record.key, record)
+                self.by_location[(record.host_api_index, record.host_device_index)] = record
+        self.scan = self.session.scans
+
+    def get(self, key: str) -> Optional[DeviceRecord]:
+        self.update()
+        return self.by_key.get(key)
+
+    def get_by_label(self, label: str) -> Optional[DeviceRecord]:
+        location = parse_label(label)
+        if location is None:
+            return None
+        self.update()
+        return self.by_location.get(location)
+
+    def default_record(self) -> Optional[DeviceRecord]:
+        """
+        System default input device, None if there is none
+        """
+        self.update()
+        if self.session.default_input is None:
+            return None
+        index = int(self.session.default_input["index"])
+        return next((r for r in self.by_location.values() if r.index == index), None)
+
+    def probe(self, host_api_index: int, host_device_index: int) -> Optional[DeviceRecord]:
+        """
+        Device at a position, straight from PortAudio without enumerating, None if there is no input device there
+        """
+        try:
+            p = self.session.p
+            info = p.get_device_info_by_host_api_device_index(host_api_index, host_device_index)
+            if int(info["maxInputChannels"]) <= 0:
+                return None
+            return DeviceRecord.from_info(info, p.get_host_api_info_by_index(host_api_index)["name"])
+        except Exception:
+            return None
+
+    def resolve(self, label: str, key: Optional[str] = None) -> Optional[DeviceRecord]:
+        """Find a saved device again, even if PortAudio renumbered the devices since it was saved.
+
+        Parameters
+        ----------
+        label : str
+            saved "[ID: i,j] | name" label
+        key : str, optional
+            saved stable key of the device. Without it (setting from an older version) the device is matched by name
+
+        Returns
+        -------
+        Optional[DeviceRecord]
+            the device, None if it is not connected
+        """
+        location = parse_label(label)
+        if location is None:
+            return None
+
+        name = label.split("|", 1)[1].strip() if "|" in label else ""
+        record = self.probe(*location)
+        if record and (record.key == key or (key is None and record.name == name)):
+            return record
+
+        if key:
+            record = self.get(key)
+        else:
+            matches = [r for r in self.records() if r.name == name]
+            record = matches[0] if len(matches) == 1 else None
+
+        if record:
+            logger.info(f"Device {name} moved from {label} to {record.label}")
+        return record
+
+    def remember(self, sj):
+        """
+        Save the key of the selected, extra and fallback devices, so they can be resolved later
+        """
+        keys = {}
+        for label in [sj.cache["device"], *sj.cache["extra_devices"], sj.cache["fallback_device"]]:
+            record = self.get_by_label(label)
+            if record and record.label == label:
+                keys[label] = record.key
+            elif label in sj.cache["device_keys"]:
+                keys[label] = sj.cache["device_keys"][label]  # not connected right now, keep what we knew
+
+        if keys != sj.cache["device_keys"]:
+            sj.save_key("device_keys", keys)
+
+    def resolve_saved(self, sj):
+        """
+        Re-resolve the saved devices, update their labels in the setting if they moved and save their keys
+        """
+        saved_keys = sj.cache["device_keys"]
+        keys = {}
+
+        def relabel(label: str) -> str:
+            record = self.resolve(label, saved_keys.get(label))
+            if record is None:
+                if label in saved_keys:  # not connected right now, keep what we knew
+                    keys[label] = saved_keys[label]
+                return label
+            keys[record.label] = record.key
+            return record.label
+
+        device = relabel(sj.cache["device"]) if sj.cache["device"] else ""
+        extra_devices = [relabel(label) for label in sj.cache["extra_devices"]]
+        fallback_device = relabel(sj.cache["fallback_device"]) if sj.cache["fallback_device"] else ""
+        saved = (sj.cache["device"], sj.cache["extra_devices"], sj.cache["fallback_device"], saved_keys)
+        if (device, extra_devices, fallback_device, keys) != saved:
+            sj.cache["device"] = device
+            sj.cache["extra_devices"] = extra_devices
+            sj.cache["fallback_device"] = fallback_device
+            sj.cache["device_keys"] = keys
+            sj.save(sj.cache)
+
+
+registry = DeviceRegistry(session)
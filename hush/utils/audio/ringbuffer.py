@@ -0,0 +1,96 @@
+__all__ = ["RingBuffer", "CallbackStats"]
+from threading import Event
+from time import perf_counter_ns
+from typing import Optional
+
+import numpy as np
+
+
+class RingBuffer:
+    """
+    Preallocated single producer, single consumer ring buffer of audio chunks.
+
+    The producer (the PortAudio callback) only copies the chunk into a free slot and wakes the consumer, it never
+    allocates and never blocks. If the consumer falls behind and every slot is full, the new chunk is dropped and
+    counted as an overrun.
+    """
+    def __init__(self, chunk_bytes: int, slots: int = 64):
+        self.chunk_bytes = chunk_bytes
+        self.slots = slots
+        self.buffer = np.zeros((slots, chunk_bytes), dtype=np.uint8)
+        self.lengths = np.zeros(slots, dtype=np.int64)
+        self.write_count = 0  # only touched by the producer
+        self.read_count = 0  # only touched by the consumer
+        self.overruns = 0
+        self.data_ready = Event()
+
+    def write(self, data: bytes) -> bool:
+        """
+        Copy a chunk into the buffer. Returns False if the chunk was dropped
+        """
+        n = len(data)
+        if self.write_count - self.read_count >= self.slots or n > self.chunk_bytes:
+            self.overruns += 1
+            return False
+
+        idx = self.write_count % self.slots
+        self.buffer[idx, :n] = np.frombuffer(data, dtype=np.uint8)
+        self.lengths[idx] = n
+        self.write_count += 1
+        self.data_ready.set()
+        return True
+
+    def read(self, timeout: Optional[float] = None) -> Optional[bytes]:
+        """
+        Get the oldest chunk, waiting up to `timeout` seconds for one. Returns None if nothing arrived
+        """
+        if self.write_count == self.read_count:
+            self.data_ready.clear()
+            # check again after clearing so a write that happened in between is not missed
+            if self.write_count == self.read_count:
+                self.data_ready.wait(timeout)
+            if self.write_count == self.read_count:
+                return None
+
+        idx = self.read_count % self.slots
+        data = self.buffer[idx, :self.lengths[idx]].tobytes()
+        self.read_count += 1
+        return data
+
+    def pending(self) -> int:
+        return self.write_count - self.read_count
+
+
+class CallbackStats:
+    """
+    Duration and status counters of the PortAudio stream callback
+    """
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.count = 0
+        self.total_ns = 0
+        self.max_ns = 0
+        self.input_overflows = 0
+
+    def add(self, start_ns: int, status: int, input_overflow_flag: int):
+        elapsed = perf_counter_ns() - start_ns
+        self.count += 1
+        self.total_ns += elapsed
+        if elapsed > self.max_ns:
+            self.max_ns = elapsed
+        if status & input_overflow_flag:
+            self.input_overflows += 1
+
+    def mean_us(self) -> float:
+        return self.total_ns / self.count / 1000 if self.count else 0.0
+
+    def max_us(self) -> float:
+        return self.max_ns / 1000
+
+    def __str__(self):
+        return (
+            f"callbacks {self.count} | mean {self.mean_us():.1f} us | max {self.max_us():.1f} us | "
+            f"input overflows {self.input_overflows}"
+        )
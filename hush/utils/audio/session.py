@@ -0,0 +1,138 @@
+__all__ = ["AudioSession", "session"]
+from threading import RLock
+from time import perf_counter
+from typing import TYPE_CHECKING, Dict, List, Optional
+
+from hush.custom_logging import logger
+
+if TYPE_CHECKING:
+    import pyaudio
+
+
+class AudioSession:
+    """
+    One long lived PyAudio instance shared by the device lists and the input streams.
+
+    Every `pyaudio.PyAudio()` runs `Pa_Initialize`, which rescans every host API (hundreds of ms with WASAPI and
+    WDM-KS). The session initializes PortAudio once and caches the host APIs, the devices and the defaults. They are
+    only scanned again on `refresh`: the rescan buttons of the device lists, and a stream that failed to open (e.g.
+    because a device went away). PortAudio only sees new devices after a re-initialization, so a refresh is refused
+    while streams are open.
+    """
+    def __init__(self):
+        self.lock = RLock()
+        self._p: Optional["pyaudio.PyAudio"] = None
+        self.streams = 0  # open streams, see `acquire` / `release`
+        self.stale = True
+        self.scans = 0  # number of enumerations, lets the users of the cache know when it changed
+        self.host_apis: List[Dict] = []
+        self.devices: List[Dict] = []  # input and output devices, with their "hostApi" and "hostApiDeviceIndex"
+        self.default_host_api: Optional[Dict] = None
+        self.default_input: Optional[Dict] = None
+        self.default_input_error = ""
+        # instrumentation
+        self.inits = 0
+        self.init_ms = 0.0  # total time spent in Pa_Initialize
+        self.scan_ms = 0.0  # total time spent in Pa_Initialize and enumerating
+        self.last_scan_ms = 0.0
+        self.hits = 0  # device list lookups served from the cache, each one used to initialize its own PyAudio
+
+    @property
+    def p(self) -> "pyaudio.PyAudio":
+        with self.lock:
+            if self._p is None:
+                import pyaudio  # only needed once a device is used, offline analysis works without PortAudio
+
+                start = perf_counter()
+                self._p = pyaudio.PyAudio()
+                self.inits += 1
+                self.init_ms += self.add_scan_time(start, "PortAudio initialized")
+            return self._p
+
+    def add_scan_time(self, start: float, what: str) -> float:
+        ms = (perf_counter() - start) * 1000
+        self.scan_ms += ms
+        self.last_scan_ms = ms
+        logger.debug(f"{what} in {ms:.1f} ms")
+        return ms
+
+    def acquire(self) -> "pyaudio.PyAudio":
+        """
+        PyAudio instance to open a stream on, call `release` once the stream is closed
+        """
+        with self.lock:
+            self.streams += 1
+            return self.p
+
+    def release(self):
+        with self.lock:
+            self.streams = max(0, self.streams - 1)
+
+    def lookup(self):
+        """
+        Enumerate for one of the device list functions, which used to initialize their own PyAudio on every call. Only
+        these count as hits, the internal lookups of the registry never initialized PortAudio.
+        """
+        with self.lock:
+            if not self.stale:
+                self.hits += 1
+            self.enumerate()
+
+    def enumerate(self):
+        with self.lock:
+            if not self.stale:
+                return
+
+            if self._p is not None and self.streams == 0:
+                # new or removed devices are only seen by a new PortAudio instance
+                self._p.terminate()
+                self._p = None
+
+            p = self.p
+            start = perf_counter()
+            self.host_apis = [p.get_host_api_info_by_index(i) for i in range(p.get_host_api_count())]
+            self.devices = [p.get_device_info_by_index(i) for i in range(p.get_device_count())]
+            try:
+                self.default_host_api = p.get_default_host_api_info()
+            except OSError as e:
+                logger.exception(e)
+                self.default_host_api = None
+            try:
+                self.default_input = p.get_default_input_device_info()
+                self.default_input_error = ""
+            except Exception as e:
+                self.default_input = None
+                self.default_input_error = str(e)
+            self.stale = False
+            self.scans += 1
+            self.add_scan_time(start, f"Enumerated {len(self.host_apis)} host APIs and {len(self.devices)} devices")
+
+    def refresh(self) -> bool:
+        """
+        Rescan the devices now, return False if it was skipped because streams are open
+        """
+        with self.lock:
+            if self.streams:
+                logger.warning(f"Not rescanning the devices while {self.streams} stream(s) are open")
+                return False
+            self.stale = True
+            self.enumerate()
+            return True
+
+    def terminate(self):
+        with self.lock:
+            logger.debug(f"Audio session: {self}")
+            if self._p is not None:
+                self._p.terminate()
+                self._p = None
+            self.stale = True
+
+    def __str__(self):
+        per_init = self.init_ms / self.inits if self.inits else 0.0
+        return (
+            f"PortAudio initialized {self.inits} time(s), {self.scan_ms:.0f} ms scanning in total, "
+            f"{self.hits} device list lookups served from cache (about {self.hits * per_init:.0f} ms saved)"
+        )
+
+
+session = AudioSession()  # PortAudio is only initialized on first use
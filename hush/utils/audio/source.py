@@ -0,0 +1,440 @@
+__all__ = [
+    "INPUT_OVERFLOW", "AudioSource", "PyAudioSource", "PullAudioSource", "WavSource", "SyntheticSource", "read_file_chunks",
+    "read_file_info", "resample_chunks", "to_int16"
+]
+import os
+import wave
+from threading import Event, Thread
+from time import perf_counter, sleep
+from typing import TYPE_CHECKING, Callable, Iterator, Optional, Tuple
+
+import numpy as np
+
+from hush.custom_logging import logger
+
+if TYPE_CHECKING:
+    import pyaudio  # imported when a device is opened, reading files and generated audio work without PortAudio
+
+try:
+    import soundfile  # optional, only needed for FLAC
+except ImportError:
+    soundfile = None
+
+# callback(in_data, status), in_data is `chunk_size` frames of interleaved int16, status uses the PortAudio flags
+ChunkCallback = Callable[[bytes, int], None]
+INPUT_OVERFLOW = 0x2  # paInputOverflow status flag
+
+
+class AudioSource:
+    """
+    Something that delivers audio chunks to a callback.
+
+    Every source follows the same contract as the PortAudio stream callback: interleaved int16 chunks of `chunk_size`
+    frames (the last chunk of a finite source can be shorter) plus the PortAudio status flags. Pull based sources only
+    implement `chunks`, the base class runs them on a thread, either paced to real time or as fast as possible.
+    """
+    def __init__(self, sample_rate: int, channels: int, chunk_size: int, realtime: bool = True, name: str = ""):
+        self.sample_rate = sample_rate
+        self.channels = channels
+        self.chunk_size = chunk_size
+        self.block_size = chunk_size  # frames per callback, several chunks for sources that read in batches
+        self.realtime = realtime
+        self.name = name
+        self.running = False
+        self.input_latency = 0.0  # seconds from the ADC to the callback of the last chunk, 0 for generated audio
+        self.finished = Event()
+        self.thread: Optional[Thread] = None
+        self.callback: Optional[ChunkCallback] = None
+
+    def chunks(self) -> Iterator[bytes]:
+        raise NotImplementedError
+
+    def start(self, callback: ChunkCallback):
+        self.callback = callback
+        self.running = True
+        self.finished.clear()
+        self.thread = Thread(target=self.run, args=[callback], daemon=True, name=f"AudioSource-{self.name}")
+        self.thread.start()
+
+    def pause(self):
+        """
+        Stop delivering chunks but keep what is needed to `resume` quickly. Generated sources simply restart
+        """
+        self.stop()
+
+    def resume(self):
+        assert self.callback is not None
+        self.start(self.callback)
+
+    def run(self, callback: ChunkCallback):
+        chunk_duration = self.chunk_size / self.sample_rate
+        next_time = perf_counter()
+        try:
+            for chunk in self.chunks():
+                if not self.running:
+                    break
+                if self.realtime:
+                    next_time += chunk_duration
+                    delay = next_time - perf_counter()
+                    if delay > 0:
+                        sleep(delay)
+                callback(chunk, 0)
+        except Exception as e:
+            logger.exception(e)
+        finally:
+            self.finished.set()
+
+    def stop(self):
+        self.running = False
+        if self.thread:
+            self.thread.join(timeout=1)
+            self.thread = None
+
+    def alive(self) -> bool:
+        """
+        False once the source stopped delivering chunks on its own, e.g. the end of a file or a lost device
+        """
+        return not self.finished.is_set()
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """
+        Wait until a finite source has delivered everything
+        """
+        return self.finished.wait(timeout)
+
+
+class PyAudioSource(AudioSource):
+    """
+    Live input device, the PortAudio callback forwards the chunk and returns immediately
+    """
+    def __init__(self, p: "pyaudio.PyAudio", device_index: int, sample_rate: int, channels: int, chunk_size: int, name=""):
+        super().__init__(sample_rate, channels, chunk_size, True, name)
+        self.p = p
+        self.device_index = device_index
+        self.stream = None
+
+    def start(self, callback: ChunkCallback):
+        import pyaudio
+
+        def stream_callback(in_data, frame_count, time_info, status):
+            latency = time_info["current_time"] - time_info["input_buffer_adc_time"]
+            if 0 <= latency < 1:  # some host APIs report no adc time
+                self.input_latency = latency
+            callback(in_data, status)
+            return (None, pyaudio.paContinue)
+
+        self.callback = callback
+
+        self.running = True
+        self.stream = self.p.open(
+            format=pyaudio.paInt16,
+            channels=self.channels,
+            rate=self.sample_rate,
+            input=True,
+            frames_per_buffer=self.chunk_size,
+            input_device_index=self.device_index,
+            stream_callback=stream_callback,
+        )
+
+    def alive(self) -> bool:
+        try:
+            return self.stream is not None and self.stream.is_active()
+        except Exception:  # the stream of a removed device can fail on any call
+            return False
+
+    def pause(self):
+        """
+        Stop the stream but keep it open, the device stays configured and `resume` only restarts it
+        """
+        self.running = False
+        if self.stream:
+            self.stream.stop_stream()
+
+    def resume(self):
+        assert self.stream is not None
+        self.running = True
+        self.stream.start_stream()
+
+    def stop(self):
+        self.running = False
+        try:
+            if self.stream:
+                if not self.stream.is_stopped():  # already stopped when paused
+                    self.stream.stop_stream()
+                self.stream.close()
+                self.stream = None
+        except Exception as e:
+            logger.exception(e)
+        self.finished.set()
+
+
+class PullAudioSource(PyAudioSource):
+    """
+    Live input device read by a dedicated thread with blocking reads of `batch` chunks at once, so python wakes up
+    `batch` times less often than with the stream callback. The callback gets the whole block.
+
+    Reads ignore overflows (`exception_on_overflow=False`). With the exception, pyaudio drops the block it has just
+    read, so every overflow would lose a valid block on top of the audio PortAudio already lost. The blocking API then
+    gives no other reliable way to tell: the frames waiting in the buffer only show the reader is behind, not that
+    anything was dropped. So the status passed to the callback is always 0 and input overflows are not counted in
+    this mode.
+    """
+    def __init__(
+        self, p: "pyaudio.PyAudio", device_index: int, sample_rate: int, channels: int, chunk_size: int, batch=4, name=""
+    ):
+        super().__init__(p, device_index, sample_rate, channels, chunk_size, name)
+        self.batch = batch
+        self.block_size = chunk_size * batch
+
+    def start(self, callback: ChunkCallback):
+        import pyaudio
+
+        self.callback = callback
+        self.stream = self.p.open(
+            format=pyaudio.paInt16,
+            channels=self.channels,
+            rate=self.sample_rate,
+            input=True,
+            frames_per_buffer=self.block_size,
+            input_device_index=self.device_index,
+        )
+        # a read returns once the whole block is captured, so its first sample is one block older than the latency
+        self.input_latency = self.stream.get_input_latency() + self.block_size / self.sample_rate
+        self.start_reader()
+
+    def start_reader(self):
+        self.running = True
+        self.finished.clear()
+        self.thread = Thread(target=self.read_loop, args=[self.callback], daemon=True, name=f"AudioSource-{self.name}")
+        self.thread.start()
+
+    def stop_reader(self):
+        """
+        Stop the stream first so a read in progress returns, then wait for the reader thread
+        """
+        self.running = False
+        try:
+            if self.stream and not self.stream.is_stopped():
+                self.stream.stop_stream()
+        except Exception as e:
+            logger.exception(e)
+        if self.thread:
+            self.thread.join(timeout=1)
+            self.thread = None
+
+    def pause(self):
+        self.stop_reader()
+
+    def resume(self):
+        assert self.stream is not None
+        self.stream.start_stream()
+        self.start_reader()
+
+    def read_loop(self, callback: ChunkCallback):
+        assert self.stream is not None
+        try:
+            while self.running:
+                callback(self.stream.read(self.block_size, exception_on_overflow=False), 0)
+        except Exception as e:
+            if self.running:  # a read interrupted by stop is expected
+                logger.exception(e)
+        finally:
+            self.finished.set()
+
+    def alive(self) -> bool:
+        return not self.finished.is_set() and super().alive()
+
+    def stop(self):
+        self.stop_reader()
+        super().stop()
+
+
+def to_int16(data: bytes, sample_width: int) -> bytes:
+    """
+    Convert little endian PCM samples of any width read from a wav file to int16
+    """
+    if sample_width == 2:
+        return data
+    if sample_width == 1:  # unsigned 8 bit
+        return ((np.frombuffer(data, dtype=np.uint8).astype(np.int16) - 128) << 8).tobytes()
+    if sample_width == 3:
+        raw = np.frombuffer(data, dtype=np.uint8).reshape(-1, 3)
+        return np.ascontiguousarray(raw[:, 1:]).view(np.int16).tobytes()  # keep the 2 most significant bytes
+    if sample_width == 4:
+        return (np.frombuffer(data, dtype=np.int32) >> 16).astype(np.int16).tobytes()
+
+    raise ValueError(f"Unsupported sample width {sample_width}")
+
+
+def check_soundfile(path: str):
+    if soundfile is None:
+        raise RuntimeError(f"Reading {os.path.splitext(path)[1]} files needs the soundfile package (pip install soundfile)")
+
+
+def read_file_info(path: str) -> Tuple[int, int]:
+    """
+    Sample rate and number of channels of a wav or flac file, the file is closed right after reading the header
+    """
+    if path.lower().endswith(".wav"):
+        with wave.open(path, "rb") as wf:
+            return wf.getframerate(), wf.getnchannels()
+
+    check_soundfile(path)
+    info = soundfile.info(path)
+    return info.samplerate, info.channels
+
+
+def read_file_chunks(path: str, chunk_size: int) -> Tuple[int, int, Iterator[bytes]]:
+    """Open an audio file and read it in bounded int16 chunks, the whole file is never loaded.
+
+    Parameters
+    ----------
+    path : str
+        path to a wav or flac file
+    chunk_size : int
+        frames per chunk
+
+    Returns
+    -------
+    Tuple[int, int, Iterator[bytes]]
+        sample rate, number of channels and the chunk iterator
+    """
+    if path.lower().endswith(".wav"):
+        wf = wave.open(path, "rb")
+
+        def wav_chunks():
+            with wf:
+                while True:
+                    data = wf.readframes(chunk_size)
+                    if not data:
+                        break
+                    yield to_int16(data, wf.getsampwidth())
+
+        return wf.getframerate(), wf.getnchannels(), wav_chunks()
+
+    check_soundfile(path)
+    sf = soundfile.SoundFile(path)
+
+    def sf_chunks():
+        with sf:
+            for block in sf.blocks(blocksize=chunk_size, dtype="int16", always_2d=True):
+                yield block.tobytes()
+
+    return sf.samplerate, sf.channels, sf_chunks()
+
+
+def resample_chunks(chunks: Iterator[bytes], channels: int, sample_rate: int, target_rate: int,
+                    chunk_size: int) -> Iterator[bytes]:
+    """Resample a stream of interleaved int16 chunks with linear interpolation, for recordings at a rate the VAD and the
+    weighting filters do not support (e.g. 44.1 kHz). There is no anti aliasing filter, which is fine for levels but
+    not for listening, so prefer a target rate above the source rate.
+
+    Parameters
+    ----------
+    chunks : Iterator[bytes]
+        interleaved int16 chunks of any size
+    channels : int
+        number of channels
+    sample_rate : int
+        rate of the chunks
+    target_rate : int
+        rate to resample to
+    chunk_size : int
+        frames per output chunk, the last one can be shorter
+
+    Returns
+    -------
+    Iterator[bytes]
+        interleaved int16 chunks at `target_rate`
+    """
+    step = sample_rate / target_rate  # input frames per output frame
+    position = 0.0  # of the next output frame, in frames from the start of `frames`
+    frames = np.zeros((0, channels))
+    pending = np.zeros((0, channels), dtype=np.int16)
+    for chunk in chunks:
+        frames = np.concatenate([frames, np.frombuffer(chunk, dtype=np.int16).reshape(-1, channels)])
+        last = len(frames) - 1
+        if last >= position:
+            t = position + step * np.arange(int((last - position) / step) + 1)
+            i = t.astype(np.int64)
+            frac = (t - i)[:, None]
+            out = frames[i] * (1 - frac) + frames[np.minimum(i + 1, last)] * frac
+            pending = np.concatenate([pending, np.round(out).astype(np.int16)])
+            position = t[-1] + step
+            keep = min(int(position), last)  # the frame before the next output position is still needed
+            frames = frames[keep:]
+            position -= keep
+
+        while len(pending) >= chunk_size:
+            yield pending[:chunk_size].tobytes()
+            pending = pending[chunk_size:]
+
+    if len(pending):
+        yield pending.tobytes()
+
+
+class WavSource(AudioSource):
+    """
+    Replay a recording (wav, or flac with soundfile installed), in real time or as fast as possible.
+    For deterministic offline processing iterate `chunks` directly, an unpaced source can outrun the engine worker.
+
+    With `sample_rate`, the chunks are resampled from the rate of the file to that rate.
+    """
+    def __init__(self, path: str, chunk_size: int = 480, realtime: bool = True, sample_rate: Optional[int] = None):
+        file_rate, channels = read_file_info(path)
+        super().__init__(sample_rate or file_rate, channels, chunk_size, realtime, os.path.basename(path))
+        self.path = path
+        self.file_rate = file_rate
+
+    def chunks(self) -> Iterator[bytes]:
+        chunks = read_file_chunks(self.path, self.chunk_size)[2]
+        if self.sample_rate != self.file_rate:
+            chunks = resample_chunks(chunks, self.channels, self.file_rate, self.sample_rate, self.chunk_size)
+        return chunks
+
+
+class SyntheticSource(AudioSource):
+    """
+    Generated signal, for running the engine without any sound hardware.
+
+    `kind` is silence, tone or noise. `level_db` is the rms level in dBFS, `seconds` of None means endless.
+    """
+    def __init__(
+        self,
+        kind: str = "tone",
+        level_db: float = -20.0,
+        sample_rate: int = 16000,
+        channels: int = 1,
+        chunk_size: int = 480,
+        seconds: Optional[float] = None,
+        realtime: bool = True,
+        frequency: float = 1000.0,
+        seed: int = 0,
+    ):
+        super().__init__(sample_rate, channels, chunk_size, realtime, f"synthetic-{kind}")
+        self.kind = kind
+        self.level_db = level_db
+        self.seconds = seconds
+        self.frequency = frequency
+        self.seed = seed
+
+    def chunks(self) -> Iterator[bytes]:
+        rng = np.random.default_rng(self.seed)
+        rms = 10**(self.level_db / 20) * 32767
+        total = None if self.seconds is None else int(self.seconds * self.sample_rate)
+        position = 0
+        while total is None or position < total:
+            n = self.chunk_size if total is None else min(self.chunk_size, total - position)
+            if self.kind == "silence":
+                x = np.zeros(n)
+            elif self.kind == "tone":
+                t = (position + np.arange(n)) / self.sample_rate
+                x = np.sqrt(2) * rms * np.sin(2 * np.pi * self.frequency * t)
+            elif self.kind == "noise":
+                x = rms * rng.standard_normal(n)
+            else:
+                raise ValueError(f"Unknown synthetic signal {self.kind}")
+
+            frames = np.repeat(np.clip(x, -32768, 32767).astype(np.int16)[:, None], self.channels, axis=1)
+            yield frames.tobytes()
+            position += n
@@ -0,0 +1,207 @@
+__all__ = ["SUPPORTED_RATES", "WEIGHTINGS", "SOS", "WeightingFilter"]
+import math
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+from hush.utils.audio.level import FULL_SCALE, MIN_DB
+
+SUPPORTED_RATES = (8000, 16000, 32000, 48000)
+WEIGHTINGS = ("A", "K")
+MAX_BLOCK = 480  # longer chunks are filtered in sub blocks, the block matrices grow with the square of their length
+
+
+def _bilinear_pole(freq: float, fs: int) -> float:
+    """
+    z plane position of a real analog pole at -2*pi*freq after the bilinear transform
+    """
+    s = -2 * math.pi * freq
+    return (1 + s / (2 * fs)) / (1 - s / (2 * fs))
+
+
+def _a_weighting_sos(fs: int) -> List[List[float]]:
+    """
+    IEC 61672 A-weighting, 4 zeros at 0 Hz and poles at 20.6, 107.7, 737.9 and 12194 Hz, bilinear transformed.
+    Normalized to 0 db at 1 kHz.
+    """
+    p1, p2, p3, p4 = (_bilinear_pole(f, fs) for f in (20.598997, 107.65265, 737.86223, 12194.217))
+    # (b0, b1, b2, a0, a1, a2) for each section, the 2 extra zeros of the bilinear transform go to z = -1
+    sos = [
+        [1.0, -2.0, 1.0, 1.0, -2 * p1, p1 * p1],
+        [1.0, -2.0, 1.0, 1.0, -(p2 + p3), p2 * p3],
+        [1.0, 2.0, 1.0, 1.0, -2 * p4, p4 * p4],
+    ]
+    gain = abs(_response(sos, 1000, fs))
+    sos[0][:3] = [b / gain for b in sos[0][:3]]
+    return sos
+
+
+def _k_weighting_sos(fs: int) -> List[List[float]]:
+    """
+    ITU-R BS.1770 K-weighting, high shelf pre filter followed by the RLB high pass.
+    Parameters are the ones that reproduce the 48 kHz coefficients of the standard at any sample rate.
+    """
+    # stage 1, high shelf
+    f0, gain_db, q = 1681.974450955533, 3.999843853973347, 0.7071752369554196
+    k = math.tan(math.pi * f0 / fs)
+    vh = 10**(gain_db / 20)
+    vb = vh**0.4996667741545416
+    a0 = 1 + k / q + k * k
+    shelf = [
+        (vh + vb * k / q + k * k) / a0,
+        2 * (k * k - vh) / a0,
+        (vh - vb * k / q + k * k) / a0,
+        1.0,
+        2 * (k * k - 1) / a0,
+        (1 - k / q + k * k) / a0,
+    ]
+
+    # stage 2, high pass
+    f0, q = 38.13547087602444, 0.5003270373238773
+    k = math.tan(math.pi * f0 / fs)
+    a0 = 1 + k / q + k * k
+    highpass = [1.0, -2.0, 1.0, 1.0, 2 * (k * k - 1) / a0, (1 - k / q + k * k) / a0]
+
+    return [shelf, highpass]
+
+
+def _response(sos: List[List[float]], freq: float, fs: int) -> complex:
+    z = np.exp(-1j * 2 * np.pi * freq / fs)
+    h = 1 + 0j
+    for b0, b1, b2, a0, a1, a2 in sos:
+        h *= (b0 + b1 * z + b2 * z * z) / (a0 + a1 * z + a2 * z * z)
+    return h
+
+
+# precomputed second order sections for every supported weighting and sample rate
+SOS: Dict[Tuple[str, int], np.ndarray] = {}
+for _fs in SUPPORTED_RATES:
+    SOS[("A", _fs)] = np.array(_a_weighting_sos(_fs))
+    SOS[("K", _fs)] = np.array(_k_weighting_sos(_fs))
+
+
+def _sosfilt_loop(sos: np.ndarray, x: np.ndarray, zi: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Reference cascade of transposed direct form II biquads, looping over samples but vectorized over columns.
+    Only used to build the block matrices.
+
+    x has shape (N, K), zi has shape (sections, 2, K). Returns the output and the final state.
+    """
+    y = x.copy()
+    z = zi.copy()
+    for s, (b0, b1, b2, _, a1, a2) in enumerate(sos):
+        for n in range(y.shape[0]):
+            xn = y[n].copy()
+            yn = b0 * xn + z[s, 0]
+            z[s, 0] = b1 * xn - a1 * yn + z[s, 1]
+            z[s, 1] = b2 * xn - a2 * yn
+            y[n] = yn
+    return y, z
+
+
+class WeightingFilter:
+    """
+    Streaming A or K weighting filter.
+
+    The cascade of biquads is a linear system, so for a fixed block length N it can be written as
+
+        y = T @ x + G @ s
+        s' = P @ x + F @ s
+
+    where s is the filter state carried across chunks. The matrices are built once per block length, after that each
+    chunk is filtered with two matrix products over all channels at once, with no per sample python loop and no edge
+    artifacts between chunks. Chunks longer than `MAX_BLOCK` frames are split into equal sub blocks that carry the
+    state the same way, so the matrices stay small whatever the chunk size.
+    """
+    def __init__(self, weighting: str, sample_rate: int, channels: int = 1):
+        if (weighting, sample_rate) not in SOS:
+            raise ValueError(f"Unsupported weighting {weighting} at {sample_rate} Hz")
+
+        self.weighting = weighting
+        self.sample_rate = sample_rate
+        self.channels = channels
+        self.sos = SOS[(weighting, sample_rate)]
+        self.order = 2 * len(self.sos)
+        self.state = np.zeros((self.order, channels))
+        self.blocks: Dict[int, Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]] = {}  # block length -> T, G, P, F
+
+    def build(self, block_len: int):
+        """
+        Build the block matrices for the given number of frames per block, at most `MAX_BLOCK`
+        """
+        n, m = block_len, self.order
+        x = np.zeros((n, n + m))
+        x[:, :n] = np.eye(n)
+        zi = np.zeros((len(self.sos), 2, n + m))
+        zi.reshape(m, n + m)[:, n:] = np.eye(m)
+
+        y, z = _sosfilt_loop(self.sos, x, zi)
+        z = z.reshape(m, n + m)
+        if len(self.blocks) > 4:  # the chunk size changed, drop the matrices of the previous one
+            self.blocks.clear()
+        self.blocks[block_len] = (y[:, :n], y[:, n:], z[:, :n], z[:, n:])
+
+    def reset(self):
+        self.state[:] = 0
+
+    def process(self, frames: np.ndarray) -> np.ndarray:
+        """Filter a chunk.
+
+        Parameters
+        ----------
+        frames : np.ndarray
+            float array of shape (frames, channels)
+
+        Returns
+        -------
+        np.ndarray
+            weighted signal with the same shape
+        """
+        n = frames.shape[0]
+        if n <= MAX_BLOCK:
+            return self.process_block(frames)
+
+        # equal sub blocks, so there are at most 2 distinct lengths to build matrices for
+        return np.concatenate([self.process_block(block) for block in np.array_split(frames, -(-n // MAX_BLOCK))])
+
+    def process_block(self, frames: np.ndarray) -> np.ndarray:
+        if frames.shape[0] not in self.blocks:
+            self.build(frames.shape[0])
+
+        T, G, P, F = self.blocks[frames.shape[0]]
+        y = T @ frames + G @ self.state
+        self.state = P @ frames + F @ self.state
+        return y
+
+    def get_db(self, audio_data, dtype: str = "int16") -> float:
+        """Weighted level of a chunk of interleaved audio data.
+
+        For A-weighting this is the rms dBFS of the weighted signal over all channels. For K-weighting this is the
+        BS.1770 loudness of the chunk (sum of the channel powers, -0.691 db offset).
+
+        Parameters
+        ----------
+        audio_data : bytes
+            interleaved audio data
+        dtype : str
+            sample format, one of int16, int32, float32
+
+        Returns
+        -------
+        float
+            level in db, `MIN_DB` if silent
+        """
+        frames = np.frombuffer(audio_data, dtype=dtype).reshape(-1, self.channels)
+        if frames.shape[0] == 0:
+            return MIN_DB
+
+        y = self.process(frames / FULL_SCALE[dtype])
+        power = np.einsum("ij,ij->j", y, y) / y.shape[0]
+        if self.weighting == "K":
+            total, offset = float(power.sum()), -0.691
+        else:
+            total, offset = float(power.mean()), 0.0
+
+        if total <= 10**(MIN_DB / 10):
+            return MIN_DB
+        return offset + 10 * math.log10(total)
@@ -0,0 +1,90 @@
+from threading import Lock
+from typing import Any, Callable, Dict
+
+from hush.custom_logging import logger
+
+_MISSING = object()
+
+
+class UiChannel:
+    """
+    Hand values from the audio threads to Tk without any Tcl call on the audio side.
+
+    `post` can be called from any thread, it only stores the latest value of every key. The Tk side drains the channel
+    in a single `after` callback, at most `max_fps` times per second, and calls `apply` with only the keys whose value
+    changed since the last drain. The drain loop only runs between `start` and `stop`, and can be paused while the
+    window is hidden, the latest values are still kept and applied on resume.
+    """
+    def __init__(self, root, apply: Callable[[Dict[str, Any]], None], max_fps: int = 30):
+        self.root = root
+        self.apply = apply
+        self.max_fps = max_fps
+        self.lock = Lock()
+        self.pending: Dict[str, Any] = {}
+        self.applied: Dict[str, Any] = {}
+        self.running = False
+        self.paused = False
+        self.after_id = None
+        self.posts = 0  # statistics, number of posts and of drains that changed something
+        self.drains = 0
+
+    def post(self, **values):
+        with self.lock:
+            self.pending.update(values)
+            self.posts += 1
+
+    def drain(self) -> Dict[str, Any]:
+        """
+        Apply the pending values that differ from the applied ones, must be called from the Tk thread
+        """
+        with self.lock:
+            pending, self.pending = self.pending, {}
+
+        changed = {k: v for k, v in pending.items() if self.applied.get(k, _MISSING) != v}
+        if changed:
+            self.applied.update(changed)
+            self.drains += 1
+            try:
+                self.apply(changed)
+            except Exception as e:
+                logger.exception(e)
+
+        return changed
+
+    def set_max_fps(self, max_fps: int):
+        self.max_fps = max_fps
+
+    def start(self):
+        """
+        Start draining, values posted before (e.g. from the previous session) are discarded
+        """
+        with self.lock:
+            self.pending.clear()
+        self.applied.clear()
+        self.running = True
+        self.schedule()
+
+    def stop(self):
+        self.running = False
+        self.cancel()
+
+    def set_paused(self, paused: bool):
+        self.paused = paused
+        if paused:
+            self.cancel()
+        else:
+            self.schedule()
+
+    def schedule(self):
+        if self.running and not self.paused and not self.after_id:
+            self.after_id = self.root.after(max(1, 1000 // self.max_fps), self.tick)
+
+    def cancel(self):
+        if self.after_id:
+            self.root.after_cancel(self.after_id)
+            self.after_id = None
+
+    def tick(self):
+        self.after_id = None
+        self.drain()
+        self.schedule()
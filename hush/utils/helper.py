@@ -84,17 +84,6 @@ def start_file(filename: str):
             nativeNotify("Error", f"Uncaught error {str(e)}")
 
 
-def get_channel_int(channel_string: str):
-    if channel_string.isdigit():
-        return int(channel_string)
-    elif channel_string.lower() == "mono":
-        return 1
-    elif channel_string.lower() == "stereo":
-        return 2
-    else:
-        raise ValueError("Invalid channel string")
-
-
 def nativeNotify(title: str, message: str):
     """
     Native notification
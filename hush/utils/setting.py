@@ -3,10 +3,7 @@ import json
 from os import makedirs, path
 from typing import List
 
-from notifypy import Notify
-
 from hush._version import __setting_version__
-from hush.components.message import mbox
 from hush.custom_logging import logger
 
 default_setting = {
@@ -15,19 +12,55 @@ default_setting = {
     "keep_log": False,
     "no_visual": False,
     "performance_mode": True,
+    "start_in_tray": False,  # start hidden in the tray and start monitoring right away
+    "meter_max_fps": 30,  # maximum refresh rate of the audio meter
+    "meter_ballistics": "Off",  # Off, VU, PPM. Off shows the rms of every chunk
+    "tray_level": True,  # show the level and alerts in the tray icon
+    "history_window": 0,  # seconds of history shown in the graph, 0 hides it. 60, 300, 1800
     # ------------------ #
     "hostAPI": "",
     "device": "",
+    "extra_devices": [],  # other devices monitored at the same time as device
+    "device_keys": {},  # saved device label -> "host API|name|channels", finds the device again if PortAudio renumbers
+    "auto_reconnect": True,  # reopen the streams when a device is lost or stops delivering audio
+    "fallback_device": "",  # used when the lost device does not come back, until the next start. empty for system default
+    "latency_profile": "balanced",  # low-latency, balanced, low-power. stream buffer and VAD frame durations
+    "capture_mode": "callback",  # callback, pull. pull reads several chunks per wakeup from a blocking stream
+    "standby": False,  # keep the streams open and paused when stopped so starting again is instant
+    "aggregation": "any",  # any, all, loudest. how the levels of multiple devices decide when to beep
     "sample_rate": "16000",  # 8000, 16000, 32000, 48000
     "channel": "Mono",  # Mono, Stereo
     "vad_mode": "Off",  # Off, 1, 2, 3
+    "weighting": "Off",  # Off, A, K
     "custom_beep_path": "",
     "beep_volume": 80,
     "beep_when_reach": -8.0,  # db
+    "beep_attack_ms": 60,  # how long the level must stay over the threshold before beeping
+    "beep_release_db": 3.0,  # how far below the threshold the level must drop to stop the alert
+    "beep_cooldown_ms": 500,  # minimum time between beeps
+    "beep_max_per_minute": 30,  # 0 means unlimited
     "mw_size": "500x250",
 }
 
 
+def Notify():
+    """
+    Lazy wrapper around notifypy, it is only needed when something goes wrong with the setting file
+    """
+    from notifypy import Notify as _Notify
+
+    return _Notify()
+
+
+def mbox(title: str, text: str, style: int):
+    """
+    Lazy wrapper around the tkinter message box so that importing the setting does not load tkinter (headless mode)
+    """
+    from hush.components.message import mbox as _mbox
+
+    return _mbox(title, text, style)  # type: ignore
+
+
 class SettingJson:
     """
     Class to handle setting.json
@@ -0,0 +1,136 @@
+"""
+Startup timing and memory measurement. Imported first by the entry point so the time is counted from there.
+"""
+import re
+import subprocess
+import sys
+from queue import Empty, Queue
+from threading import Thread
+from time import perf_counter
+from typing import List, Optional
+
+from hush.custom_logging import logger
+
+START = perf_counter()
+
+
+def elapsed_ms() -> float:
+    return (perf_counter() - START) * 1000
+
+
+def peak_rss_mb() -> float:
+    """
+    Peak resident memory of the process in MB, 0 if it can not be read on this platform
+    """
+    try:
+        if sys.platform == "win32":
+            import ctypes
+            from ctypes import wintypes
+
+            class PROCESS_MEMORY_COUNTERS(ctypes.Structure):
+                _fields_ = [
+                    ("cb", wintypes.DWORD),
+                    ("PageFaultCount", wintypes.DWORD),
+                    ("PeakWorkingSetSize", ctypes.c_size_t),
+                    ("WorkingSetSize", ctypes.c_size_t),
+                    ("QuotaPeakPagedPoolUsage", ctypes.c_size_t),
+                    ("QuotaPagedPoolUsage", ctypes.c_size_t),
+                    ("QuotaPeakNonPagedPoolUsage", ctypes.c_size_t),
+                    ("QuotaNonPagedPoolUsage", ctypes.c_size_t),
+                    ("PagefileUsage", ctypes.c_size_t),
+                    ("PeakPagefileUsage", ctypes.c_size_t),
+                ]
+
+            counters = PROCESS_MEMORY_COUNTERS()
+            counters.cb = ctypes.sizeof(counters)
+            ctypes.windll.psapi.GetProcessMemoryInfo(  # type: ignore
+                ctypes.windll.kernel32.GetCurrentProcess(), ctypes.byref(counters), counters.cb  # type: ignore
+            )
+            return counters.PeakWorkingSetSize / 2**20
+
+        import resource
+
+        rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return rss / 2**20 if sys.platform == "darwin" else rss / 2**10  # bytes on macOS, kB on linux
+    except Exception:
+        return 0.0
+
+
+def log_startup(stage: str):
+    """
+    Log how long after the start a stage was reached, and the peak memory so far
+    """
+    logger.info(f"Startup: {stage} after {elapsed_ms():.0f} ms, peak RSS {peak_rss_mb():.1f} MB")
+
+
+IMPORT_TIME_RE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|(\s*)(\S+)")
+STAGE_RE = re.compile(r"Startup: (.+ ms, peak RSS .+ MB)")
+READY_STAGE = "first audio chunk"
+
+
+def read_lines(stream, lines: "Queue[Optional[str]]"):
+    """
+    Forward the lines of a pipe to a queue, None once it is closed, so the reader can wait with a timeout
+    """
+    for line in stream:
+        lines.put(line)
+    lines.put(None)
+
+
+def profile_startup(args: List[str], timeout: float = 30.0, top: int = 25):
+    """Run hush with `args` in a child process under `python -X importtime` until the first audio chunk is analyzed,
+    then print the slowest imports and the startup stages.
+
+    Parameters
+    ----------
+    args : List[str]
+        command line arguments for the child, without --profile-startup
+    timeout : float
+        seconds to wait for the first audio chunk
+    top : int
+        number of imports to show
+    """
+    imports = []  # (self us, cumulative us, depth, module)
+    stages = []
+    proc = subprocess.Popen(
+        [sys.executable, "-X", "importtime", "-m", "hush", *args],
+        stdout=subprocess.PIPE,
+        stderr=subprocess.STDOUT,
+        text=True,
+        errors="replace",
+    )
+    lines: "Queue[Optional[str]]" = Queue()
+    Thread(target=read_lines, args=[proc.stdout, lines], daemon=True).start()
+    deadline = perf_counter() + timeout
+    try:
+        while True:
+            try:
+                line = lines.get(timeout=max(0.0, deadline - perf_counter()))
+            except Empty:  # the child can stay silent forever, e.g. the window is open but no device is selected
+                print(f"No audio chunk after {timeout:.0f} s, stopping")
+                break
+            if line is None:
+                print(f"Hush exited with code {proc.wait()} before the first audio chunk")
+                break
+            m = IMPORT_TIME_RE.match(line)
+            if m:
+                imports.append((int(m[1]), int(m[2]), len(m[3]) // 2, m[4]))
+                continue
+            m = STAGE_RE.search(line)
+            if m:
+                stages.append(m[1])
+                if m[1].startswith(READY_STAGE):
+                    break
+    finally:
+        proc.kill()
+        proc.wait()
+
+    top_level = [i for i in imports if i[2] == 0]
+    print(f"Imports: {len(imports)} modules, {sum(i[1] for i in top_level) / 1000:.1f} ms in total")
+    print(f"{'cumulative':>12} {'self':>10}  module (slowest {top})")
+    for self_us, cumulative_us, _, module in sorted(imports, key=lambda i: -i[1])[:top]:
+        print(f"{cumulative_us / 1000:>9.1f} ms {self_us / 1000:>7.1f} ms  {module}")
+
+    print("Stages:")
+    for stage in stages:
+        print(f"  {stage}")